@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""Compare the date parser of the models with the former strptime implementation.
+
+    Usage: python benchmarks/datetime_parse.py [number of timestamps]
+"""
+import random
+import sys
+import timeit
+
+from whoishistory.models.historic import _parse_datetime, _strptime_datetime
+
+
+def timestamps(count: int, distinct: int, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+
+    pool = ['20%02d-%02d-%02dT%02d:%02d:%02d%s' % (
+        rnd.randrange(1, 21), rnd.randrange(1, 13), rnd.randrange(1, 29),
+        rnd.randrange(24), rnd.randrange(60), rnd.randrange(60),
+        rnd.choice(['+00:00', '-07:00', '+05:30'])) for _ in range(distinct)]
+
+    return [rnd.choice(pool) for _ in range(count)]
+
+
+def run(name: str, fn, values: list, clear_cache: bool):
+    def parse_all():
+        if clear_cache:
+            _parse_datetime.cache_clear()
+        for v in values:
+            fn(v)
+
+    best = min(timeit.repeat(parse_all, number=1, repeat=5))
+    print('%-30s %8.3f us per timestamp' % (name, best / len(values) * 1e6))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    unique = timestamps(count, count)
+    repeated = timestamps(count, 200)
+
+    run('strptime', _strptime_datetime, unique, False)
+    run('fast parser, all distinct', _parse_datetime.__wrapped__, unique, False)
+    run('cached, all distinct', _parse_datetime, unique, True)
+    run('cached, 200 distinct', _parse_datetime, repeated, True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""Measure the memory retained per record by each record type.
+
+    Usage: python benchmarks/memory.py [number of records]
+"""
+import gc
+import json
+import sys
+import tracemalloc
+
+from whoishistory.models.historic import WhoisRecord, LazyWhoisRecord, CompactWhoisRecord
+from whoishistory.models.interning import Interner
+from whoishistory.models.projection import Projection, HEAVY_TEXT_FIELDS
+from whoishistory.testing.synthetic import synthetic_records
+
+
+def measure(make_factory, body: str) -> float:
+    """Return the memory retained per record once the response dict is released."""
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    record_factory = make_factory()
+    records = [record_factory(v) for v in json.loads(body)['records']]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return (after - before) / len(records)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    body = json.dumps({'records': synthetic_records(count)})
+
+    print('%d records, %.0f bytes of JSON per record' % (count, len(body) / count))
+    factories = [
+        ('WhoisRecord', lambda: WhoisRecord),
+        ('CompactWhoisRecord', lambda: CompactWhoisRecord),
+        ('LazyWhoisRecord', lambda: LazyWhoisRecord),
+        ('Interner()', lambda: Interner()),
+        ('Interner(CompactWhoisRecord)', lambda: Interner(CompactWhoisRecord)),
+        ('Projection(exclude=HEAVY)', lambda: Projection(exclude=HEAVY_TEXT_FIELDS)),
+        ('Interner(Projection(...))', lambda: Interner(Projection(exclude=HEAVY_TEXT_FIELDS))),
+    ]
+
+    for name, factory in factories:
+        print('%-30s %8.0f bytes per record' % (name, measure(factory, body)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""Time the hot paths of the package on seeded synthetic responses.
+
+    Usage: python benchmarks/suite.py [--sizes 1,1000,10000] [--output results.json] [--compare base.json]
+
+    Results are written as JSON with the commit they were measured on, and
+    --compare prints the ratio of every timing to the one of an earlier run.
+"""
+import argparse
+import datetime
+import io
+import json
+import pickle
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+from whoishistory import ApiClient, Requester
+from whoishistory.json_backend import BACKENDS
+from whoishistory.models.historic import WhoisRecord, LazyWhoisRecord, CompactWhoisRecord, _parse_datetime
+from whoishistory.models.interning import Interner
+from whoishistory.testing.synthetic import synthetic_response
+
+
+class MockRequester(Requester):
+    def __init__(self, body: bytes):
+        super().__init__('benchmark')
+        self.body = body
+
+    def request(self, url, method: str = "GET", headers: dict = None, params: dict = None,
+                stream: bool = False) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(self.body)
+        return response
+
+
+def _git(*args) -> str or None:
+    try:
+        return subprocess.check_output(('git',) + args, stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(fn, repeat: int, setup=None) -> list:
+    """Return the duration of repeat calls of fn in seconds, setup runs untimed before each."""
+
+    timings = []
+
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+
+    return timings
+
+
+def benchmarks(size: int, seed: int):
+    """Yield the name and the function of every benchmark for a response of size records."""
+
+    body = synthetic_response(size, seed)
+    text = body.decode('utf-8')
+    values = json.loads(body)['records']
+
+    for name, loads in BACKENDS.items():
+        yield 'parse.' + name, lambda loads=loads: loads(body), None
+    yield 'parse.json_text', lambda: json.loads(text), None
+
+    for factory in (WhoisRecord, CompactWhoisRecord, LazyWhoisRecord):
+        yield 'build.' + factory.__name__, lambda factory=factory: [factory(v) for v in values], None
+    yield 'build.Interner', lambda: list(map(Interner(), values)), None
+
+    records = [WhoisRecord(v) for v in values]
+    copies = [WhoisRecord(v) for v in values]
+    yield 'compare.equal', lambda: [a == b for a, b in zip(records, copies)], None
+    yield 'compare.different', lambda: [a == b for a, b in zip(records, copies[1:] + copies[:1])], None
+
+    fresh = []
+
+    def new_records():
+        # fingerprints are cached, so every run hashes new records
+        fresh[:] = [WhoisRecord(v) for v in values]
+
+    yield 'compare.set', lambda: set(fresh), new_records
+
+    # records returned by the workers of purchase_many(process_pool=...) are pickled
+    interned = list(map(Interner(), values))
+    yield 'ipc.WhoisRecord', lambda: pickle.loads(pickle.dumps(records)), None
+    yield 'ipc.Interner', lambda: pickle.loads(pickle.dumps(interned)), None
+
+    dates = [v[key] for v in values for key in ('createdDateISO8601', 'updatedDateISO8601', 'expiresDateISO8601')]
+    yield 'dates.parse', lambda: [_parse_datetime(d) for d in dates], _parse_datetime.cache_clear
+    yield 'dates.cached', lambda: [_parse_datetime(d) for d in dates], None
+
+    client = ApiClient('benchmark')
+    client.set_requester(MockRequester(body))
+    yield 'purchase.WhoisRecord', lambda: client.purchase('example.test'), None
+    yield 'purchase.dedup', lambda: client.purchase('example.test', dedup=True), None
+    yield 'purchase.raw', lambda: client.purchase_raw('example.test'), None
+    yield 'purchase.stream', lambda: list(client.iter_purchase('example.test')), None
+
+
+def run(sizes: list, repeat: int, seed: int) -> dict:
+    results = []
+
+    for size in sizes:
+        for name, fn, setup in benchmarks(size, seed):
+            timings = measure(fn, repeat, setup)
+            results.append({
+                'name': name,
+                'records': size,
+                'min': min(timings),
+                'median': statistics.median(timings),
+                'per_record': min(timings) / size,
+            })
+            sys.stderr.write('%-26s %7d records %10.3f ms %9.2f us per record\n' % (
+                name, size, min(timings) * 1e3, min(timings) / size * 1e6))
+
+    return {
+        'commit': _git('rev-parse', 'HEAD'),
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare(base: dict, current: dict):
+    timings = {(r['name'], r['records']): r['min'] for r in base['results']}
+
+    print('compared with %s' % (base.get('commit') or 'unknown commit'))
+    for r in current['results']:
+        before = timings.get((r['name'], r['records']))
+        if before:
+            print('%-26s %7d records %6.2fx' % (r['name'], r['records'], r['min'] / before))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1,1000,10000', help='comma separated numbers of records')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed runs, the fastest is kept')
+    parser.add_argument('--seed', type=int, default=1, help='seed of the synthetic responses')
+    parser.add_argument('--output', help='file receiving the results as JSON, stdout by default')
+    parser.add_argument('--compare', help='results of an earlier run to compare with')
+    args = parser.parse_args()
+
+    current = run([int(s) for s in args.sizes.split(',')], args.repeat, args.seed)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+    else:
+        json.dump(current, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), current)
+
+
+if __name__ == '__main__':
+    main()
@@ -59,10 +59,30 @@ setup(
         'whois history',
         'whoisxmlapi',
     ],
+    entry_points={
+        'console_scripts': [
+            'whoishistory=whoishistory.cli:main',
+        ],
+    },
     install_requires=[
         'requests',
     ],
     extras_require={
+        'async': [
+            'aiohttp',
+        ],
+        'columnar': [
+            'numpy',
+            'pyarrow',
+            'pandas',
+        ],
+        'json': [
+            'orjson',
+        ],
+        'compression': [
+            'brotli',
+            'zstandard',
+        ],
         'dev': [
             'mock',
             'tox',
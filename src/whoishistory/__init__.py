@@ -1,4 +1,6 @@
-__all__ = ['exceptions', 'models', 'ApiClient']
+__all__ = ['exceptions', 'models', 'ApiClient', 'AsyncApiClient', 'AsyncRequester']
 
 from .api_client import ApiClient
 from .api_client import Requester
+from .async_api_client import AsyncApiClient
+from .async_requester import AsyncRequester
@@ -1,33 +1,188 @@
 # -*- coding: utf-8 -*-
-from typing import List
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Iterable, Iterator
 from datetime import date
-import json
+import copy
+import logging
+import multiprocessing
+import sys
+import time
+from .batch import BatchResult, run_batch
+from .cache import cache_key
 from .exceptions import UnparsableResponseException, EmptyResponseException
+from .json_backend import get_loads
+from .metrics import Metrics
+from .planner import BYTES_PER_RECORD, Plan, make_plan
 from .requester import Requester
+from .sharding import SHARD_OPTIONS, date_range, merge_shards, split_windows
+from .singleflight import SingleFlight
+from .streaming import iter_records
 
 from .models.historic import WhoisRecord, ErrorMessage
+from .models.interning import Interner
+from .models.projection import Projection
 
 __version__ = '1.0.3'
 
+_logger = logging.getLogger('whoishistory-api-client')
+
+_search_options = [
+    'sinceDate',
+    'createdDateFrom',
+    'createdDateTo',
+    'updatedDateFrom',
+    'updatedDateTo',
+    'expiredDateFrom',
+    'expiredDateTo',
+]
+
+
+def _mode_params(api_key, domain_name: str, mode: str) -> dict:
+    return {
+        'domainName': domain_name,
+        'apiKey': api_key,
+        'outputFormat': 'JSON',
+        'mode': mode,
+    }
+
+
+def _search_params(params: dict or None, options: dict) -> dict:
+    if params is None:
+        params = dict()
+
+    for k in options:
+        if k in _search_options:
+            d: date = options[k]
+            params[k] = d.strftime("%Y-%m-%d")
+
+    return params
+
+
+def _parse(content, loads=None) -> dict:
+    if loads is None:
+        loads = get_loads()
+
+    try:
+        dictionary = loads(content)
+    except Exception as e:
+        raise UnparsableResponseException(e.__str__())
+
+    return dictionary
+
+
+def _parse_response(content, loads=None) -> dict:
+    if len(content) == 0:
+        raise EmptyResponseException()
+
+    parsed = _parse(content, loads)
+
+    if 'code' in parsed or 'messages' in parsed:
+        raise ErrorMessage(parsed)
+
+    return parsed
+
+
+def _records_value(parsed: dict, record_factory=WhoisRecord) -> List[WhoisRecord]:
+    if 'records' not in parsed:
+        raise EmptyResponseException()
+
+    res: List[WhoisRecord] = list()
+
+    records = parsed['records']
+    if isinstance(records, list):
+        for r in records:
+            res.append(record_factory(r))
+
+    return res
+
+
+def _record_factory(record_factory, dedup: bool, fields, exclude):
+    if fields is not None or exclude is not None:
+        record_factory = Projection(record_factory, fields, exclude)
+
+    if dedup:
+        record_factory = Interner(record_factory)
+
+    return record_factory
+
+
+def _build_records(content: bytes, loads, record_factory, dedup: bool, fields, exclude) -> List[WhoisRecord]:
+    # Runs in a worker process. With dedup, shared values are pickled once on
+    # the way back and the result is about half the size.
+    return _records_value(_parse_response(content, loads), _record_factory(record_factory, dedup, fields, exclude))
+
+
+def _process_pool(max_workers: int) -> ProcessPoolExecutor:
+    # forking copies the locks of the running HTTP threads and of the session,
+    # possibly held, so the workers are started from a fresh interpreter
+    if sys.version_info < (3, 7):
+        return ProcessPoolExecutor(max_workers)
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+    return ProcessPoolExecutor(max_workers, mp_context=context)
+
+
+def _records_count_value(parsed: dict) -> int:
+    if 'recordsCount' not in parsed:
+        raise EmptyResponseException()
+
+    return int(parsed['recordsCount'])
+
 
 class ApiClient:
     __version = __version__
     __url_whois = "https://whois-history.whoisxmlapi.com/api/v1"
     __user_agent = "whoishistory-python/" + __version__
 
-    def __init__(self, api_key):
+    def __init__(self, api_key, cache=None, coalesce: bool = False, json_backend=None, metrics: Metrics = None,
+                 url: str = None, **requester_options):
         """Init ApiClient instance.
             :param api_key: your api_key
+            :param cache: response cache, e.g. MemoryCache, SqliteCache or TieredCache
+            :param coalesce: share one request between concurrent calls with identical
+                parameters, all of them receive its result or exception
+            :param json_backend: name of the JSON parser in whoishistory.json_backend.BACKENDS,
+                or a callable parsing the response body from bytes. The fastest
+                installed one of orjson, simdjson, ujson and json by default
+            :param metrics: receiver of per-phase timings, sizes, record counts and errors,
+                e.g. whoishistory.metrics.PrometheusMetrics. Nothing is measured without it
+            :param url: API endpoint, e.g. the url of a whoishistory.testing.StubServer
+            :key pool_connections: number of per-host connection pools to cache
+            :key pool_maxsize: maximum number of keep-alive connections per host
+            :key max_retries: number of retries on connection errors
+            :key pool_block: block when the connection pool is exhausted
+            :key rate_limiter: RateLimiter shared by the requests
+            :key retry_policy: RetryPolicy for 429 and 5xx responses
+            :key compress: accept gzip, deflate, br and zstd compressed responses, True by default
         """
 
         self.api_key = api_key
 
-        self.requester = Requester(self.__user_agent)
+        if url is not None:
+            self.__url_whois = url
+
+        self.cache = cache
 
-    def purchase(self, domain_name: str, **options) -> List[WhoisRecord]:
+        self.singleflight = SingleFlight() if coalesce else None
+
+        self.json_loads = get_loads(json_backend)
+
+        self.metrics = metrics
+
+        self.requester = Requester(self.__user_agent, metrics=metrics, **requester_options)
+
+    def purchase(self, domain_name: str, record_factory=WhoisRecord, dedup: bool = False,
+                 fields=None, exclude=None, **options) -> List[WhoisRecord]:
         """Purchase returns the slice of records.
 
             :param domain_name: the domain for which historic WHOIS data is requested
+            :param record_factory: callable building a record from its response dict,
+                e.g. LazyWhoisRecord to convert fields on first access
+            :param dedup: share equal strings, dates, contacts and audits between records
+            :param fields: names of the fields to build, e.g. ['domain_name', 'registrant_contact.email']
+            :param exclude: names of the fields to skip, e.g. HEAVY_TEXT_FIELDS
             :key sinceDate: search records discovered since the given date
             :key createdDateFrom: search records created after given date
             :key createdDateTo: search records created before given date
@@ -37,24 +192,182 @@ class ApiClient:
             :key expiredDateTo: search records expires before given date
         """
 
-        parsed = self.__call_api(self.__url_whois, method='GET', params={
-            'domainName': domain_name,
-            'apiKey': self.api_key,
-            'outputFormat': 'JSON',
-            'mode': 'purchase',
-        }, **options)
+        parsed = self.__call_api(self.__url_whois, method='GET',
+                                 params=_mode_params(self.api_key, domain_name, 'purchase'), **options)
+
+        record_factory = _record_factory(record_factory, dedup, fields, exclude)
+
+        if self.metrics is None:
+            return _records_value(parsed, record_factory)
+
+        records = self.__measure('build', lambda: _records_value(parsed, record_factory))
+        self.metrics.records(len(records))
+
+        return records
+
+    def purchase_raw(self, domain_name: str, **options) -> List[dict]:
+        """Purchase_raw returns the records as response dicts, without building WhoisRecord objects.
+
+            The result can be converted to columns with whoishistory.models.columnar.
+
+            :param domain_name: the domain for which historic WHOIS data is requested
+            :key sinceDate: search records discovered since the given date
+            :key createdDateFrom: search records created after given date
+            :key createdDateTo: search records created before given date
+            :key updatedDateFrom: search records updated after given date
+            :key updatedDateTo: search records updated before given date
+            :key expiredDateFrom: search records expires after given date
+            :key expiredDateTo: search records expires before given date
+        """
+
+        parsed = self.__call_api(self.__url_whois, method='GET',
+                                 params=_mode_params(self.api_key, domain_name, 'purchase'), **options)
 
         if 'records' not in parsed:
             raise EmptyResponseException()
 
-        res: List[WhoisRecord] = list()
-
         records = parsed['records']
-        if isinstance(records, list):
-            for r in records:
-                res.append(WhoisRecord(r))
+        if not isinstance(records, list):
+            return []
 
-        return res
+        # the cache and coalesced calls share the parsed response, the caller gets its own records
+        if self.cache is not None or self.singleflight is not None:
+            records = copy.deepcopy(records)
+
+        return records
+
+    def iter_purchase(self, domain_name: str, chunk_size: int = 65536, record_factory=WhoisRecord,
+                      dedup: bool = False, fields=None, exclude=None, **options) -> Iterator[WhoisRecord]:
+        """Iter_purchase streams the response and yields records one at a time.
+
+            Memory use does not depend on the number of records and the first
+            record is available before the download completes. Errors are raised
+            as in purchase, but an error response is only detected once the body
+            has been read. The response cache is not used.
+
+            :param domain_name: the domain for which historic WHOIS data is requested
+            :param chunk_size: number of bytes read from the connection at once
+            :param record_factory: callable building a record from its response dict
+            :param dedup: share equal strings, dates, contacts and audits between records
+            :param fields: names of the fields to build, e.g. ['domain_name', 'registrant_contact.email']
+            :param exclude: names of the fields to skip, e.g. HEAVY_TEXT_FIELDS
+            :key sinceDate: search records discovered since the given date
+            :key createdDateFrom: search records created after given date
+            :key createdDateTo: search records created before given date
+            :key updatedDateFrom: search records updated after given date
+            :key updatedDateTo: search records updated before given date
+            :key expiredDateFrom: search records expires after given date
+            :key expiredDateTo: search records expires before given date
+        """
+
+        record_factory = _record_factory(record_factory, dedup, fields, exclude)
+
+        params = _search_params(_mode_params(self.api_key, domain_name, 'purchase'), options)
+
+        response = self.requester.request(self.__url_whois, method='GET', params=params, stream=True)
+        decoded = [0]
+
+        def chunks():
+            # decompressed by urllib3 while streaming
+            for chunk in response.iter_content(chunk_size):
+                decoded[0] += len(chunk)
+                yield chunk
+
+        count = 0
+
+        try:
+            for r in iter_records(chunks(), self.json_loads):
+                yield record_factory(r)
+                count += 1
+        finally:
+            self.requester.count_transfer(response, decoded[0])
+            response.close()
+
+            if self.metrics is not None:
+                self.metrics.records(count)
+
+    def purchase_sharded(self, domain_name: str, max_records: int = 1000, max_workers: int = 4,
+                         shard_by: str = 'updated', shard_retries: int = 2, record_factory=WhoisRecord,
+                         dedup: bool = False, fields=None, exclude=None, **options) -> List[WhoisRecord]:
+        """Purchase a long history as parallel purchases of date windows.
+
+            The search is split into windows of the shard_by date by bisecting
+            on preview counts, until every window has at most max_records
+            records. When the counts of the windows do not add up to the total,
+            e.g. for records without that date, a single purchase is made
+            instead. Each window is a purchase and is charged as such.
+
+            Windows are fetched concurrently and a failed one is retried alone.
+            Records repeated by overlapping windows are merged, then built in
+            date window order. The response cache is used per window.
+
+            :param domain_name: the domain for which historic WHOIS data is requested
+            :param max_records: maximum number of records of a window
+            :param max_workers: number of concurrent requests
+            :param shard_by: date of the windows: 'updated', 'created' or 'expired'
+            :param shard_retries: number of retries of a failed window
+            :param record_factory: callable building a record from its response dict
+            :param dedup: share equal strings, dates, contacts and audits between records
+            :param fields: names of the fields to build
+            :param exclude: names of the fields to skip
+            :key sinceDate: search records discovered since the given date
+            :key createdDateFrom: search records created after given date
+            :key createdDateTo: search records created before given date
+            :key updatedDateFrom: search records updated after given date
+            :key updatedDateTo: search records updated before given date
+            :key expiredDateFrom: search records expires after given date
+            :key expiredDateTo: search records expires before given date
+        """
+
+        lo, hi = date_range(shard_by, options)
+        date_from, date_to = SHARD_OPTIONS[shard_by]
+
+        def window_options(first: date, last: date) -> dict:
+            return dict(options, **{date_from: first, date_to: last})
+
+        total = self.preview(domain_name, **options)
+
+        windows = []
+        if total > max_records:
+            windows = split_windows(lambda first, last: self.preview(domain_name, **window_options(first, last)),
+                                    lo, hi, max_records, max_workers)
+
+        if len(windows) < 2 or sum(n for _, _, n in windows) != total:
+            if windows:
+                _logger.warning(
+                    '%s: %d records in windows of %s date, %d in total, purchased at once',
+                    domain_name, sum(n for _, _, n in windows), shard_by, total)
+            return self.purchase(domain_name, record_factory, dedup, fields, exclude, **options)
+
+        def fetch(window: tuple) -> List[dict]:
+            attempt = 0
+            while True:
+                try:
+                    return self.purchase_raw(domain_name, **window_options(window[0], window[1]))
+                except ErrorMessage:
+                    # rejected by the API, e.g. for lack of credits
+                    raise
+                except Exception:
+                    if attempt >= shard_retries:
+                        raise
+                    attempt += 1
+
+        shards = []
+        for res in run_batch(fetch, windows, max_workers):
+            if not res.ok:
+                raise res.error
+            shards.append(res.result)
+
+        merged = {'records': merge_shards(shards)}
+        record_factory = _record_factory(record_factory, dedup, fields, exclude)
+
+        if self.metrics is None:
+            return _records_value(merged, record_factory)
+
+        records = self.__measure('build', lambda: _records_value(merged, record_factory))
+        self.metrics.records(len(records))
+
+        return records
 
     def preview(self, domain_name: str, **options: date) -> int:
         """Preview returns the number of records. No credits deducted.
@@ -69,60 +382,192 @@ class ApiClient:
             :key expiredDateTo: search records expires before given date
         """
 
-        parsed = self.__call_api(self.__url_whois, method='GET', params={
-            'domainName': domain_name,
-            'apiKey': self.api_key,
-            'outputFormat': 'JSON',
-            'mode': 'preview',
-        }, **options)
+        parsed = self.__call_api(self.__url_whois, method='GET',
+                                 params=_mode_params(self.api_key, domain_name, 'preview'), **options)
+
+        return _records_count_value(parsed)
+
+    def purchase_many(self, domain_names: Iterable[str], max_workers: int = 8, ordered: bool = True,
+                      process_pool=None, **options) -> Iterator[BatchResult]:
+        """Purchase records for many domains concurrently.
+
+            Yields a BatchResult per domain whose result is the list of records.
+            Errors are captured in BatchResult.error instead of being raised.
+            Workers share this client's requester, so its pool_maxsize should
+            be at least max_workers.
+
+            With process_pool, threads only download the responses, which are
+            parsed and built into records by worker processes. Records built
+            with dedup are sent back at half the size and four times faster.
+            record_factory and the JSON backend must be picklable, and an
+            Executor given should not fork, e.g. use the 'forkserver' or
+            'spawn' start method. The response cache is not used.
+
+            :param domain_names: the domains for which historic WHOIS data is requested
+            :param max_workers: number of worker threads
+            :param ordered: yield results in input order instead of completion order
+            :param process_pool: number of worker processes, or an Executor such as
+                a ProcessPoolExecutor shared between calls
+            :key record_factory: callable building a record from its response dict
+            :key dedup: share equal strings, dates, contacts and audits between records
+            :key fields: names of the fields to build
+            :key exclude: names of the fields to skip
+            :key sinceDate: search records discovered since the given date
+            :key createdDateFrom: search records created after given date
+            :key createdDateTo: search records created before given date
+            :key updatedDateFrom: search records updated after given date
+            :key updatedDateTo: search records updated before given date
+            :key expiredDateFrom: search records expires after given date
+            :key expiredDateTo: search records expires before given date
+        """
 
-        if 'recordsCount' not in parsed:
-            raise EmptyResponseException()
+        if process_pool is None:
+            return run_batch(lambda d: self.purchase(d, **options), domain_names, max_workers, ordered)
+
+        return self.__purchase_many_pooled(domain_names, max_workers, ordered, process_pool, options)
+
+    def __purchase_many_pooled(self, domain_names: Iterable[str], max_workers: int, ordered: bool,
+                               process_pool, options: dict) -> Iterator[BatchResult]:
+
+        executor = process_pool if isinstance(process_pool, Executor) else _process_pool(process_pool)
 
-        return int(parsed['recordsCount'])
+        try:
+            yield from run_batch(lambda d: self.__purchase_pooled(executor, d, **options),
+                                 domain_names, max_workers, ordered)
+        finally:
+            if executor is not process_pool:
+                executor.shutdown()
+
+    def __purchase_pooled(self, executor: Executor, domain_name: str, record_factory=WhoisRecord,
+                          dedup: bool = False, fields=None, exclude=None, **options) -> List[WhoisRecord]:
+
+        params = _search_params(_mode_params(self.api_key, domain_name, 'purchase'), options)
+
+        response = self.requester.request(self.__url_whois, method='GET', params=params)
+
+        def build():
+            return executor.submit(_build_records, response.content, self.json_loads,
+                                   record_factory, dedup, fields, exclude).result()
 
-    __options = [
-        'sinceDate',
-        'createdDateFrom',
-        'createdDateTo',
-        'updatedDateFrom',
-        'updatedDateTo',
-        'expiredDateFrom',
-        'expiredDateTo',
-    ]
+        if self.metrics is None:
+            return build()
+
+        # parsed and built in the worker process, measured as a whole
+        records = self.__measure('build', build)
+        self.metrics.records(len(records))
+
+        return records
+
+    def preview_many(self, domain_names: Iterable[str], max_workers: int = 8, ordered: bool = True,
+                     **options: date) -> Iterator[BatchResult]:
+        """Preview many domains concurrently. No credits deducted.
+
+            Yields a BatchResult per domain whose result is the number of records.
+            Errors are captured in BatchResult.error instead of being raised.
+
+            :param domain_names: the domains for which historic WHOIS data is requested
+            :param max_workers: number of worker threads
+            :param ordered: yield results in input order instead of completion order
+            :key sinceDate: search records discovered since the given date
+            :key createdDateFrom: search records created after given date
+            :key createdDateTo: search records created before given date
+            :key updatedDateFrom: search records updated after given date
+            :key updatedDateTo: search records updated before given date
+            :key expiredDateFrom: search records expires after given date
+            :key expiredDateTo: search records expires before given date
+        """
+
+        return run_batch(lambda d: self.preview(d, **options), domain_names, max_workers, ordered)
+
+    def plan(self, domain_names: Iterable[str], max_workers: int = 8, budget: int = None,
+             credits_per_purchase: int = 1, bytes_per_record: int = BYTES_PER_RECORD, **options: date) -> Plan:
+        """Preview many domains and plan their purchases. No credits deducted.
+
+            Domains without records are not purchased, and once budget is
+            reached the remaining domains are left out in input order. The
+            purchases are scheduled largest history first.
+
+            :param domain_names: the domains, in priority order
+            :param max_workers: number of worker threads
+            :param budget: maximum number of credits spent, unlimited by default
+            :param credits_per_purchase: credits charged by a purchase call
+            :param bytes_per_record: estimated size of a record in a response
+            :key sinceDate: search records discovered since the given date
+            :key createdDateFrom: search records created after given date
+            :key createdDateTo: search records created before given date
+            :key updatedDateFrom: search records updated after given date
+            :key updatedDateTo: search records updated before given date
+            :key expiredDateFrom: search records expires after given date
+            :key expiredDateTo: search records expires before given date
+        """
+
+        previews = self.preview_many(domain_names, max_workers, **options)
+
+        return make_plan(previews, budget, credits_per_purchase, bytes_per_record, options)
+
+    def purchase_plan(self, plan: Plan, max_workers: int = 8, **options) -> Iterator[BatchResult]:
+        """Purchase the domains of a plan concurrently, in its schedule order.
+
+            Yields a BatchResult per domain in completion order, with the
+            search options of the plan.
+
+            :param plan: the Plan returned by plan
+            :param max_workers: number of worker threads
+            :key record_factory: callable building a record from its response dict
+            :key dedup: share equal strings, dates, contacts and audits between records
+            :key fields: names of the fields to build
+            :key exclude: names of the fields to skip
+            :key process_pool: number of worker processes, or an Executor
+        """
+
+        options = dict(plan.options, **options)
+
+        return self.purchase_many(plan.domain_names, max_workers, ordered=False, **options)
 
     def __call_api(self, url, method, headers: dict = None, params: dict = None, **options) -> dict:
 
-        if params is None:
-            params = dict()
+        params = _search_params(params, options)
 
-        for k in options:
-            if k in self.__options:
-                d: date = options[k]
-                params[k] = d.strftime("%Y-%m-%d")
+        key = None
+        if self.cache is not None or self.singleflight is not None:
+            key = cache_key(params)
 
-        response = self.requester.request(url, method=method, headers=headers, params=params)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
 
-        text = response.text
+        if self.singleflight is not None:
+            return self.singleflight.do(key, lambda: self.__fetch(url, method, headers, params, key))
 
-        if len(text) == 0:
-            raise EmptyResponseException()
+        return self.__fetch(url, method, headers, params, key)
 
-        parsed = self.__parse(text)
+    def __fetch(self, url, method, headers: dict, params: dict, key: str or None) -> dict:
 
-        if 'code' in parsed or 'messages' in parsed:
-            raise ErrorMessage(parsed)
+        response = self.requester.request(url, method=method, headers=headers, params=params)
+
+        if self.metrics is None:
+            parsed = _parse_response(response.content, self.json_loads)
+        else:
+            parsed = self.__measure('parse', lambda: _parse_response(response.content, self.json_loads))
+
+        if self.cache is not None:
+            self.cache.set(key, parsed)
 
         return parsed
 
-    @staticmethod
-    def __parse(string_response) -> dict:
+    def __measure(self, phase: str, fn):
+        started = time.perf_counter()
+
         try:
-            dictionary = json.loads(string_response)
+            res = fn()
         except Exception as e:
-            raise UnparsableResponseException(e.__str__())
+            self.metrics.error(phase, e)
+            raise
+
+        self.metrics.timing(phase, time.perf_counter() - started)
 
-        return dictionary
+        return res
 
     def set_requester(self, requester):
         """Set the requester instance.
@@ -133,3 +578,14 @@ class ApiClient:
 
         if isinstance(requester, Requester):
             self.requester = requester
+
+    def close(self):
+        """Close the underlying requester and its pooled connections."""
+
+        self.requester.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+from typing import List
+from datetime import date
+from .api_client import __version__, _mode_params, _search_params, _parse_response, _records_value, \
+    _records_count_value, _record_factory
+from .async_requester import AsyncRequester
+from .json_backend import get_loads
+
+from .models.historic import WhoisRecord
+
+
+class AsyncApiClient:
+    __version = __version__
+    __url_whois = "https://whois-history.whoisxmlapi.com/api/v1"
+    __user_agent = "whoishistory-python/" + __version__
+
+    def __init__(self, api_key, json_backend=None, url: str = None, **requester_options):
+        """Init AsyncApiClient instance.
+            :param api_key: your api_key
+            :param json_backend: name of the JSON parser in whoishistory.json_backend.BACKENDS,
+                or a callable parsing the response body from bytes
+            :param url: API endpoint, e.g. the url of a whoishistory.testing.StubServer
+            :key max_concurrency: maximum number of requests in flight
+            :key pool_maxsize: maximum number of pooled connections
+            :key pool_maxsize_per_host: maximum number of pooled connections per host
+            :key rate_limiter: RateLimiter shared by the requests
+            :key retry_policy: RetryPolicy for 429 and 5xx responses
+        """
+
+        self.api_key = api_key
+
+        if url is not None:
+            self.__url_whois = url
+
+        self.json_loads = get_loads(json_backend)
+
+        self.requester = AsyncRequester(self.__user_agent, **requester_options)
+
+    async def purchase(self, domain_name: str, record_factory=WhoisRecord, dedup: bool = False,
+                       fields=None, exclude=None, **options) -> List[WhoisRecord]:
+        """Purchase returns the slice of records.
+
+            :param domain_name: the domain for which historic WHOIS data is requested
+            :param record_factory: callable building a record from its response dict,
+                e.g. LazyWhoisRecord to convert fields on first access
+            :param dedup: share equal strings, dates, contacts and audits between records
+            :param fields: names of the fields to build, e.g. ['domain_name', 'registrant_contact.email']
+            :param exclude: names of the fields to skip, e.g. HEAVY_TEXT_FIELDS
+            :key sinceDate: search records discovered since the given date
+            :key createdDateFrom: search records created after given date
+            :key createdDateTo: search records created before given date
+            :key updatedDateFrom: search records updated after given date
+            :key updatedDateTo: search records updated before given date
+            :key expiredDateFrom: search records expires after given date
+            :key expiredDateTo: search records expires before given date
+        """
+
+        parsed = await self.__call_api(self.__url_whois, method='GET',
+                                       params=_mode_params(self.api_key, domain_name, 'purchase'), **options)
+
+        return _records_value(parsed, _record_factory(record_factory, dedup, fields, exclude))
+
+    async def preview(self, domain_name: str, **options: date) -> int:
+        """Preview returns the number of records. No credits deducted.
+
+            :param domain_name: the domain for which historic WHOIS data is requested
+            :key sinceDate: search records discovered since the given date
+            :key createdDateFrom: search records created after given date
+            :key createdDateTo: search records created before given date
+            :key updatedDateFrom: search records updated after given date
+            :key updatedDateTo: search records updated before given date
+            :key expiredDateFrom: search records expires after given date
+            :key expiredDateTo: search records expires before given date
+        """
+
+        parsed = await self.__call_api(self.__url_whois, method='GET',
+                                       params=_mode_params(self.api_key, domain_name, 'preview'), **options)
+
+        return _records_count_value(parsed)
+
+    async def __call_api(self, url, method, headers: dict = None, params: dict = None, **options) -> dict:
+
+        params = _search_params(params, options)
+
+        response = await self.requester.request(url, method=method, headers=headers, params=params)
+
+        return _parse_response(response.body, self.json_loads)
+
+    def set_requester(self, requester):
+        """Set the requester instance.
+
+            Keyword arguments:
+            :param requester: the AsyncRequester instance
+        """
+
+        if isinstance(requester, AsyncRequester):
+            self.requester = requester
+
+    async def close(self):
+        """Close the underlying requester and its pooled connections."""
+
+        await self.requester.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
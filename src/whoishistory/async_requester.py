@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from .exceptions import ServerErrorException
+from .rate_limiter import RateLimiter, RetryPolicy, _is_retryable, _retry_after
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+# AsyncResponse is the status, headers and body of a response, read before
+# its connection is released to the pool
+class AsyncResponse:
+    status: int
+    headers: dict
+    body: bytes
+
+    def __init__(self, status: int, headers, body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def text(self) -> str:
+        return self.body.decode('utf-8', 'replace')
+
+
+class AsyncRequester(object):
+    _logger_marker = 'whoishistory-async-requester'
+
+    def __init__(self, user_agent, max_concurrency: int = 100, pool_maxsize: int = 100,
+                 pool_maxsize_per_host: int = 0, session=None, rate_limiter: RateLimiter = None,
+                 retry_policy: RetryPolicy = None):
+        """Initialise an instance of AsyncRequester with given user_agent string
+
+            Requires the optional aiohttp dependency. The aiohttp session is
+            created lazily on the first request so the requester may be built
+            outside of a running event loop.
+
+            Keyword arguments:
+            :param user_agent: user Agent header
+            :param max_concurrency: maximum number of requests in flight
+            :param pool_maxsize: maximum number of pooled connections
+            :param pool_maxsize_per_host: maximum number of pooled connections
+                per host, 0 for no limit
+            :param session: use the given aiohttp.ClientSession instead of creating one
+            :param rate_limiter: limiter shared by the requests, slowed down by 429 responses
+            :param retry_policy: retries of 429 and 5xx responses, without it
+                ServerErrorException is raised on the first one
+        """
+
+        self.user_agent = user_agent
+
+        self.logger = logging.getLogger(self._logger_marker)
+
+        self.max_concurrency = max_concurrency
+        self.pool_maxsize = pool_maxsize
+        self.pool_maxsize_per_host = pool_maxsize_per_host
+
+        self.session = session
+        self._semaphore = None
+
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+
+    def _get_session(self):
+        if self.session is None:
+            if aiohttp is None:
+                raise ImportError('AsyncRequester requires aiohttp: pip install whois-history[async]')
+
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_maxsize,
+                limit_per_host=self.pool_maxsize_per_host,
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+
+        return self.session
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        return self._semaphore
+
+    async def request(self, url, method: str = "GET", headers: dict = None, params: dict = None) -> AsyncResponse:
+        """Perform a http(s) request for given parameters to given URL
+
+            The response body is read before the connection is released
+            and returned in an AsyncResponse.
+
+            :param url: API url
+            :param method: http method
+            :param params: query parameters
+            :param headers: query headers
+        """
+
+        if headers is None:
+            headers = dict()
+
+        if params is None:
+            params = dict()
+
+        headers.update({
+            'Accept': 'application/json',
+            'User-Agent': self.user_agent,
+        })
+
+        session = self._get_session()
+        attempt = 0
+
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+
+            async with self._get_semaphore():
+                async with session.request(method, url, headers=headers, params=params) as r:
+                    response = AsyncResponse(r.status, r.headers, await r.read())
+
+            if not _is_retryable(response.status):
+                if self.rate_limiter is not None:
+                    self.rate_limiter.success()
+                return response
+
+            retry_after = _retry_after(response.headers)
+
+            if response.status == 429 and self.rate_limiter is not None:
+                self.rate_limiter.throttle(retry_after)
+
+            if self.retry_policy is None or attempt >= self.retry_policy.max_retries:
+                raise ServerErrorException(response.status, response.text())
+
+            delay = self.retry_policy.delay(attempt, retry_after)
+            self.logger.warning('%s %s returned %d, retrying in %.1fs', method, url, response.status, delay)
+            await asyncio.sleep(delay)
+
+            attempt += 1
+
+    async def close(self):
+        """Close the session and release pooled connections."""
+
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,82 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Iterable, Iterator
+
+
+# BatchResult is the outcome of one domain of a batch call.
+# Exactly one of result and error is set.
+class BatchResult:
+    domain_name: str
+    result: object
+    error: Exception or None
+
+    def __init__(self, domain_name: str, result=None, error: Exception = None):
+        self.domain_name = domain_name
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __str__(self):
+        return str(self.__dict__)
+
+
+def _call(fn: Callable, domain_name: str) -> BatchResult:
+    try:
+        return BatchResult(domain_name, result=fn(domain_name))
+    except Exception as e:
+        return BatchResult(domain_name, error=e)
+
+
+def run_batch(fn: Callable, domains: Iterable[str], max_workers: int = 8,
+              ordered: bool = True) -> Iterator[BatchResult]:
+    """Call fn for every domain on a thread pool and yield BatchResult objects.
+
+        At most 2 * max_workers calls are queued at once, so domains may be
+        a lazy iterable of any length. When the consumer stops early or is
+        interrupted, the queued calls are cancelled and the running ones
+        are waited for.
+
+        :param fn: callable accepting a domain name
+        :param domains: domain names
+        :param max_workers: number of worker threads
+        :param ordered: yield in input order rather than completion order
+    """
+
+    window = max_workers * 2
+    domains = iter(domains)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque() if ordered else set()
+
+        def submit() -> bool:
+            for d in domains:
+                f = executor.submit(_call, fn, d)
+                if ordered:
+                    pending.append(f)
+                else:
+                    pending.add(f)
+                return True
+            return False
+
+        try:
+            while len(pending) < window and submit():
+                pass
+
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    pending.difference_update(done)
+
+                for f in done:
+                    submit()
+                    yield f.result()
+        except BaseException:
+            # e.g. GeneratorExit or KeyboardInterrupt
+            for f in pending:
+                f.cancel()
+            raise
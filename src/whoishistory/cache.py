@@ -0,0 +1,207 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(params: dict) -> str:
+    """Build the cache key of an API call from its query parameters.
+
+        The API key is left out and the domain name is lower-cased, search
+        dates are already normalized to YYYY-MM-DD by the client.
+    """
+
+    items = []
+    for k in sorted(params):
+        if k == 'apiKey':
+            continue
+        v = params[k]
+        if k == 'domainName':
+            v = str(v).lower()
+        items.append('%s=%s' % (k, v))
+
+    return '&'.join(items)
+
+
+# CacheStats counts the lookups of a cache
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self):
+        return str(self.__dict__)
+
+
+class MemoryCache:
+    """In-memory LRU cache of parsed responses."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = None):
+        """Init MemoryCache instance.
+            :param max_entries: number of responses kept before the least recently used is evicted
+            :param ttl: seconds a response stays valid, None for no expiry
+        """
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict or None:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[1] is not None and entry[1] < time.time():
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+
+            return entry[0]
+
+    def set(self, key: str, value: dict):
+        expires = time.time() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteCache:
+    """On-disk cache of responses in a SQLite database, evicting least recently used entries."""
+
+    def __init__(self, path: str, ttl: float = 86400, max_entries: int = 100000):
+        """Init SqliteCache instance.
+            :param path: database file, created if missing
+            :param ttl: seconds a response stays valid, None for no expiry
+            :param max_entries: number of responses kept before the least recently used are evicted
+        """
+
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires REAL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+        ''')
+
+    def get(self, key: str) -> dict or None:
+        now = time.time()
+
+        with self._lock, self._db:
+            row = self._db.execute('SELECT value, expires FROM responses WHERE key = ?', (key,)).fetchone()
+
+            if row is not None and row[1] is not None and row[1] < now:
+                self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                row = None
+
+            if row is None:
+                self.stats.misses += 1
+                return None
+
+            self._db.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+            self.stats.hits += 1
+
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict):
+        now = time.time()
+        expires = now + self.ttl if self.ttl is not None else None
+        text = json.dumps(value)
+
+        with self._lock, self._db:
+            self._db.execute('INSERT OR REPLACE INTO responses (key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+                             (key, text, expires, now))
+
+            excess = self._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._db.execute('DELETE FROM responses WHERE key IN '
+                                 '(SELECT key FROM responses ORDER BY accessed LIMIT ?)', (excess,))
+                self.stats.evictions += excess
+
+    def purge_expired(self):
+        """Delete expired responses."""
+
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM responses WHERE expires < ?', (time.time(),))
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM responses')
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+
+class TieredCache:
+    """Cache looking up its tiers in order, e.g. a MemoryCache in front of a SqliteCache.
+
+        A hit in a lower tier is copied to the tiers above it.
+    """
+
+    def __init__(self, *tiers):
+        self.tiers = tiers
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> dict or None:
+        for i, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                for upper in self.tiers[:i]:
+                    upper.set(key, value)
+                self.stats.hits += 1
+                return value
+
+        self.stats.misses += 1
+        return None
+
+    def set(self, key: str, value: dict):
+        for tier in self.tiers:
+            tier.set(key, value)
+
+    def clear(self):
+        for tier in self.tiers:
+            tier.clear()
@@ -0,0 +1,102 @@
+import datetime
+from collections import OrderedDict
+from typing import Iterable, Iterator
+
+DEFAULT_FIELDS = (
+    'registrar_name',
+    'whois_server',
+    'name_servers',
+    'status',
+    'registrant_contact',
+)
+
+_min_date = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+
+
+# Change is a difference of one field between consecutive records of a domain
+class Change:
+    domain_name: str
+    field: str
+    old: object
+    new: object
+    timestamp: datetime.datetime or None
+
+    def __init__(self, domain_name: str, field: str, old, new, timestamp: datetime.datetime or None):
+        self.domain_name = domain_name
+        self.field = field
+        self.old = old
+        self.new = new
+        self.timestamp = timestamp
+
+    def __str__(self):
+        return str(self.__dict__)
+
+    def __eq__(self, other):
+        return isinstance(other, Change) and \
+               self.domain_name == other.domain_name and \
+               self.field == other.field and \
+               self.old == other.old and \
+               self.new == other.new and \
+               self.timestamp == other.timestamp
+
+
+def _updated_date(record) -> datetime.datetime or None:
+    return getattr(record.audit, 'updated_date', None)
+
+
+def _sort_key(record) -> datetime.datetime:
+    d = _updated_date(record)
+    return _min_date if d is None else d
+
+
+def _fingerprint(field: str, value):
+    # Name servers are compared without regard to order and case,
+    # other lists such as status without regard to order.
+    if isinstance(value, list):
+        if field == 'name_servers':
+            return tuple(sorted(v.lower() for v in value))
+        return tuple(sorted(value))
+    return value
+
+
+def detect_changes(records: Iterable, fields=DEFAULT_FIELDS) -> Iterator[Change]:
+    """Yield the changes between consecutive records of one domain.
+
+        Records are ordered by audit.updated_date, records without it first.
+        Each record is reduced to a tuple of per-field fingerprints, so records
+        identical to the previous one cost a single tuple comparison.
+
+        :param records: records of a single domain, in any order
+        :param fields: names of the WhoisRecord fields to compare
+    """
+
+    previous = None
+    previous_prints = None
+
+    for record in sorted(records, key=_sort_key):
+        prints = tuple(_fingerprint(f, getattr(record, f)) for f in fields)
+
+        if previous_prints is not None and prints != previous_prints:
+            timestamp = _updated_date(record)
+            for i, f in enumerate(fields):
+                if prints[i] != previous_prints[i]:
+                    yield Change(record.domain_name, f, getattr(previous, f), getattr(record, f), timestamp)
+
+        previous = record
+        previous_prints = prints
+
+
+def detect_changes_by_domain(records: Iterable, fields=DEFAULT_FIELDS) -> Iterator[Change]:
+    """Group records of many domains by domain_name and yield the changes of each domain.
+
+        :param records: records of any number of domains, in any order
+        :param fields: names of the WhoisRecord fields to compare
+    """
+
+    domains = OrderedDict()
+    for record in records:
+        domains.setdefault(record.domain_name.lower(), []).append(record)
+
+    for history in domains.values():
+        for change in detect_changes(history, fields):
+            yield change
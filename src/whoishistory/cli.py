@@ -0,0 +1,223 @@
+"""Command line interface running preview or purchase over a list of domains.
+
+    Usage: whoishistory {preview,purchase} [input] [-o output] [-c checkpoint]
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import threading
+from typing import IO, Iterable, Iterator
+
+from .api_client import ApiClient
+from .batch import run_batch
+from .rate_limiter import RateLimiter, RetryPolicy
+
+_date_options = (
+    ('since-date', 'sinceDate', 'records discovered since the given date'),
+    ('created-date-from', 'createdDateFrom', 'records created after the given date'),
+    ('created-date-to', 'createdDateTo', 'records created before the given date'),
+    ('updated-date-from', 'updatedDateFrom', 'records updated after the given date'),
+    ('updated-date-to', 'updatedDateTo', 'records updated before the given date'),
+    ('expired-date-from', 'expiredDateFrom', 'records expiring after the given date'),
+    ('expired-date-to', 'expiredDateTo', 'records expiring before the given date'),
+)
+
+
+def _date(value: str) -> datetime.date:
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError('expected a date as YYYY-MM-DD: ' + value)
+
+
+def read_domains(lines: Iterable[str], errors: IO = None) -> Iterator[str]:
+    """Yield the domains of a plain list or of JSONL lines with a domainName member.
+
+        Blank lines and lines starting with # are skipped. Invalid JSON lines
+        and domainName members that are not strings are skipped and reported
+        with their line number to errors, stderr by default.
+    """
+
+    if errors is None:
+        errors = sys.stderr
+
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        if line.startswith('{'):
+            try:
+                line = json.loads(line).get('domainName', '')
+            except (ValueError, AttributeError) as e:
+                errors.write('line %d skipped, invalid JSON: %s\n' % (number, e))
+                continue
+
+            if not isinstance(line, str):
+                errors.write('line %d skipped, domainName is not a string\n' % number)
+                continue
+
+        if line:
+            yield line
+
+
+def read_checkpoint(path: str) -> set:
+    """Return the domains recorded as completed in a checkpoint file."""
+
+    if not os.path.exists(path):
+        return set()
+
+    with open(path, encoding='utf-8') as f:
+        return set(line.strip() for line in f if line.strip())
+
+
+def run(client: ApiClient, mode: str, domains: Iterable[str], output: IO, checkpoint: IO = None,
+        done: set = None, max_workers: int = 8, **options) -> dict:
+    """Preview or purchase domains concurrently and write one JSON line per domain.
+
+        Completed domains are appended to checkpoint after their result is
+        written, and domains in done are skipped. Failed domains get a line
+        with an error member and are not checkpointed, so a resumed run
+        retries them. On interrupt, the queued domains are dropped and the
+        running ones are written as they complete. Returns the number of
+        ok, failed and skipped domains.
+
+        :param client: the ApiClient
+        :param mode: 'preview' or 'purchase'
+        :param domains: the domains
+        :param output: text stream receiving the JSON lines
+        :param checkpoint: text stream receiving the completed domains
+        :param done: domains completed by a previous run
+        :param max_workers: number of concurrent requests
+        :key sinceDate: search records discovered since the given date
+        :key createdDateFrom: search records created after given date
+        :key createdDateTo: search records created before given date
+        :key updatedDateFrom: search records updated after given date
+        :key updatedDateTo: search records updated before given date
+        :key expiredDateFrom: search records expires after given date
+        :key expiredDateTo: search records expires before given date
+    """
+
+    if mode == 'preview':
+        def fetch(d):
+            return {'recordsCount': client.preview(d, **options)}
+    elif mode == 'purchase':
+        def fetch(d):
+            return {'records': client.purchase_raw(d, **options)}
+    else:
+        raise ValueError('unknown mode: ' + mode)
+
+    if done is None:
+        done = set()
+
+    counts = {'ok': 0, 'failed': 0, 'skipped': 0}
+    lock = threading.Lock()
+
+    def pending():
+        seen = set()
+        for d in domains:
+            key = d.lower()
+            if key in done or key in seen:
+                with lock:
+                    counts['skipped'] += 1
+                continue
+            seen.add(key)
+            yield d
+
+    def call(d):
+        # results are written by the worker, so the calls still running
+        # when the job is interrupted are written and checkpointed too
+        line = {'domainName': d}
+        error = None
+
+        try:
+            line.update(fetch(d))
+        except Exception as e:
+            error = e
+            line['error'] = str(e)
+            line['errorType'] = type(e).__name__
+
+        with lock:
+            output.write(json.dumps(line, ensure_ascii=False) + '\n')
+            output.flush()
+
+            if error is not None:
+                counts['failed'] += 1
+                return
+
+            counts['ok'] += 1
+
+            if checkpoint is not None:
+                checkpoint.write(d.lower() + '\n')
+                checkpoint.flush()
+
+    for _ in run_batch(call, pending(), max_workers, ordered=False):
+        pass
+
+    return counts
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='whoishistory', description='Query the WHOIS History API for many domains.')
+    parser.add_argument('mode', choices=['preview', 'purchase'], help='preview counts records, purchase spends credits')
+    parser.add_argument('input', nargs='?', default='-',
+                        help='file with one domain per line or JSON lines with domainName, - for stdin')
+    parser.add_argument('-o', '--output', default='-', help='JSON lines output file, - for stdout')
+    parser.add_argument('-c', '--checkpoint',
+                        help='file of completed domains, skipped when the job is run again')
+    parser.add_argument('-k', '--api-key', default=os.environ.get('WHOISHISTORY_API_KEY'),
+                        help='API key, WHOISHISTORY_API_KEY by default')
+    parser.add_argument('-w', '--workers', type=int, default=8, help='number of concurrent requests')
+    parser.add_argument('--retries', type=int, default=3, help='retries of 429 and 5xx responses')
+    parser.add_argument('--rate', type=float, help='maximum number of requests per second')
+
+    for flag, _, description in _date_options:
+        parser.add_argument('--' + flag, type=_date, help='search ' + description)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = _parser().parse_args(argv)
+
+    if not args.api_key:
+        _parser().error('an API key is required, use --api-key or WHOISHISTORY_API_KEY')
+
+    options = dict()
+    for flag, key, _ in _date_options:
+        value = getattr(args, flag.replace('-', '_'))
+        if value is not None:
+            options[key] = value
+
+    client = ApiClient(
+        args.api_key,
+        pool_maxsize=max(10, args.workers),
+        retry_policy=RetryPolicy(max_retries=args.retries) if args.retries > 0 else None,
+        rate_limiter=RateLimiter(args.rate, burst=args.workers) if args.rate else None,
+    )
+
+    # a resumed job appends to the results of the previous runs
+    resume = args.checkpoint is not None and os.path.exists(args.checkpoint)
+
+    done = set()
+    checkpoint = None
+    if args.checkpoint is not None:
+        done = read_checkpoint(args.checkpoint)
+        checkpoint = open(args.checkpoint, 'a', encoding='utf-8')
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    output = sys.stdout if args.output == '-' else open(args.output, 'a' if resume else 'w', encoding='utf-8')
+
+    try:
+        with client:
+            counts = run(client, args.mode, read_domains(source), output, checkpoint, done, args.workers, **options)
+    finally:
+        for f in (source, output, checkpoint):
+            if f is not None and f not in (sys.stdin, sys.stdout):
+                f.close()
+
+    sys.stderr.write('%(ok)d ok, %(failed)d failed, %(skipped)d skipped\n' % counts)
+
+    return 1 if counts['failed'] else 0
@@ -2,3 +2,6 @@ class ServerErrorException(Exception):
     def __init__(self, status_code, message):
         self.status_code = status_code
         self.message = message
+
+    def __str__(self):
+        return '[' + str(self.status_code) + '] ' + self.message
@@ -0,0 +1,58 @@
+import json
+from collections import OrderedDict
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:  # pragma: no cover
+    simdjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+
+def _installed_backends() -> OrderedDict:
+    # fastest first, every loads function accepts bytes and str
+    backends = OrderedDict()
+
+    if orjson is not None:
+        backends['orjson'] = orjson.loads
+    if simdjson is not None:
+        backends['simdjson'] = simdjson.loads
+    if ujson is not None:
+        backends['ujson'] = ujson.loads
+
+    backends['json'] = json.loads
+
+    return backends
+
+
+BACKENDS = _installed_backends()
+
+DEFAULT_BACKEND = next(iter(BACKENDS))
+
+
+def get_loads(backend=None):
+    """Return the function parsing a JSON document from bytes or str.
+
+        :param backend: name of an installed backend in BACKENDS, or a callable
+            taking the response body as bytes. The fastest installed backend
+            by default
+    """
+
+    if backend is None:
+        return BACKENDS[DEFAULT_BACKEND]
+
+    if callable(backend):
+        return backend
+
+    if backend not in BACKENDS:
+        raise ValueError('JSON backend is not installed: ' + str(backend))
+
+    return BACKENDS[backend]
@@ -0,0 +1,163 @@
+import threading
+from collections import OrderedDict
+
+# default histogram buckets in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Metrics:
+    """Receiver of instrumentation events of ApiClient and Requester.
+
+        Every method does nothing, subclasses override the ones they need.
+        Clients created without metrics skip the instrumentation entirely.
+
+        Phases are 'ttfb' (request sent until the response headers, including
+        connecting), 'download' (response headers until the body is read),
+        'parse' (JSON decoding) and 'build' (record construction).
+
+        With a process pool, purchase_many measures parsing and building in
+        the worker process, including the transfer of the response and the
+        records, as 'build'. purchase_raw builds no records, so it reports
+        neither 'build' nor records, and the windows of purchase_sharded are
+        only counted once merged and built. iter_purchase parses and builds
+        while downloading, so it reports records but no 'parse' or 'build'.
+    """
+
+    def timing(self, phase: str, seconds: float):
+        """Called with the duration of a phase of a call."""
+
+    def transferred(self, wire_bytes: int or None, decoded_bytes: int):
+        """Called with the size of a response body before and after decompression."""
+
+    def records(self, count: int):
+        """Called with the number of records built by a purchase."""
+
+    def retry(self, status_code: int, delay: float):
+        """Called before a 429 or 5xx response is retried."""
+
+    def error(self, phase: str, error: Exception):
+        """Called with an exception raised in a phase: 'request', 'parse' or 'build'."""
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ''
+
+    return '{' + ','.join('%s="%s"' % (k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in labels) + '}'
+
+
+def _number(value: float) -> str:
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Histogram:
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class PrometheusMetrics(Metrics):
+    """Metrics kept as Prometheus counters and histograms.
+
+        expose() returns them in the Prometheus text format, e.g. to be
+        served on a /metrics endpoint or written for the node exporter.
+    """
+
+    def __init__(self, prefix: str = 'whoishistory', buckets: tuple = BUCKETS):
+        """Init PrometheusMetrics instance.
+            :param prefix: prefix of the metric names
+            :param buckets: upper bounds of the duration histogram buckets in seconds
+        """
+
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+
+        self._counters = OrderedDict()
+        self._histograms = OrderedDict()
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Increase a counter."""
+
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Add an observation to a histogram."""
+
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    def counter(self, name: str, **labels) -> float:
+        """Return the value of a counter."""
+
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def timing(self, phase: str, seconds: float):
+        self.observe('phase_seconds', seconds, phase=phase)
+
+    def transferred(self, wire_bytes: int or None, decoded_bytes: int):
+        self.inc('responses_total')
+        if wire_bytes is not None:
+            self.inc('wire_bytes_total', wire_bytes)
+        self.inc('decoded_bytes_total', decoded_bytes)
+
+    def records(self, count: int):
+        self.inc('records_total', count)
+
+    def retry(self, status_code: int, delay: float):
+        self.inc('retries_total', status=status_code)
+
+    def error(self, phase: str, error: Exception):
+        self.inc('errors_total', phase=phase, error=type(error).__name__)
+
+    def expose(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+
+        lines = []
+
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                name = self.prefix + '_' + name
+                if name not in typed:
+                    typed.add(name)
+                    lines.append('# TYPE %s counter' % name)
+                lines.append('%s%s %s' % (name, _labels(labels), _number(value)))
+
+            for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+                name = self.prefix + '_' + name
+                if name not in typed:
+                    typed.add(name)
+                    lines.append('# TYPE %s histogram' % name)
+
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append('%s_bucket%s %d' % (name, _labels(labels + (('le', _number(bound)),)), cumulative))
+                lines.append('%s_bucket%s %d' % (name, _labels(labels + (('le', '+Inf'),)), histogram.count))
+
+                lines.append('%s_sum%s %s' % (name, _labels(labels), _number(histogram.sum)))
+                lines.append('%s_count%s %d' % (name, _labels(labels), histogram.count))
+
+        return '\n'.join(lines) + '\n'
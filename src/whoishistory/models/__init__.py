@@ -1,3 +1,5 @@
-__all__ = ['WhoisRecord']
+__all__ = ['WhoisRecord', 'LazyWhoisRecord', 'CompactWhoisRecord', 'Interner', 'Projection']
 
-from .historic import WhoisRecord
+from .historic import WhoisRecord, LazyWhoisRecord, CompactWhoisRecord
+from .interning import Interner
+from .projection import Projection
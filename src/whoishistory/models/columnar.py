@@ -0,0 +1,168 @@
+from typing import List
+
+from .historic import _whois_record_fields, _contact_fields, _contact_keys, _parse_datetime, \
+    _string_value, _string_list_value, _datetime_value, _audit_value, _contact_value
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+try:
+    import pandas
+except ImportError:  # pragma: no cover
+    pandas = None
+
+_nat = -2 ** 63
+
+
+def _column_names() -> list:
+    names = []
+
+    for name, _, converter in _whois_record_fields:
+        if converter is _audit_value:
+            names.extend(['audit_created_date', 'audit_updated_date'])
+        elif converter is _contact_value:
+            names.extend(name + '_' + field for field in _contact_fields)
+        else:
+            names.append(name)
+
+    return names
+
+
+COLUMNS = tuple(_column_names())
+
+
+def _epoch_seconds(value: str, cache: dict) -> int:
+    seconds = cache.get(value)
+    if seconds is None:
+        seconds = int(_parse_datetime(value).timestamp())
+        cache[value] = seconds
+    return seconds
+
+
+def _date_column(values: list, key: str, cache: dict) -> list:
+    column = []
+
+    for v in values:
+        d = v.get(key) if isinstance(v, dict) else None
+        column.append(_nat if d is None else _epoch_seconds(str(d), cache))
+
+    return column
+
+
+def _build_columns(records: list, columns) -> dict:
+    # one pass per column over the response dicts, without building records
+    wanted = set(COLUMNS if columns is None else columns)
+    unknown = wanted.difference(COLUMNS)
+    if unknown:
+        raise ValueError('unknown columns: ' + ', '.join(sorted(unknown)))
+
+    cache = dict()
+    res = dict()
+
+    for name, key, converter in _whois_record_fields:
+        if converter is _audit_value:
+            audits = [r.get(key) for r in records]
+            for column, audit_key in (('audit_created_date', 'createdDate'), ('audit_updated_date', 'updatedDate')):
+                if column in wanted:
+                    res[column] = ('date', _date_column(audits, audit_key, cache))
+        elif converter is _contact_value:
+            contacts = [r.get(key) or {} for r in records]
+            for field, contact_key in zip(_contact_fields, _contact_keys):
+                column = name + '_' + field
+                if column in wanted:
+                    res[column] = ('string', [_string_value(c, contact_key) for c in contacts])
+        elif name not in wanted:
+            continue
+        elif converter is _datetime_value:
+            res[name] = ('date', _date_column(records, key, cache))
+        elif converter is _string_list_value:
+            res[name] = ('list', [_string_list_value(r, key) for r in records])
+        else:
+            res[name] = ('string', [_string_value(r, key) for r in records])
+
+    return {name: res[name] for name in COLUMNS if name in res}
+
+
+def to_numpy(records: List[dict], columns=None) -> dict:
+    """Convert response records to a dict of NumPy arrays keyed by column name.
+
+        Dates are datetime64[s] in UTC with NaT for missing values, strings
+        and lists of strings are object arrays. Contacts and audit are
+        flattened, e.g. registrant_contact_email and audit_updated_date.
+
+        :param records: the "records" list of a purchase response, see ApiClient.purchase_raw
+        :param columns: names of the columns to build, all of COLUMNS by default
+    """
+
+    if numpy is None:
+        raise ImportError('to_numpy requires numpy: pip install whois-history[columnar]')
+
+    res = dict()
+
+    for name, (kind, values) in _build_columns(records, columns).items():
+        if kind == 'date':
+            res[name] = numpy.array(values, dtype='int64').view('datetime64[s]')
+        else:
+            column = numpy.empty(len(values), dtype=object)
+            column[:] = values
+            res[name] = column
+
+    return res
+
+
+def to_arrow(records: List[dict], columns=None):
+    """Convert response records to a pyarrow.Table.
+
+        Dates are timestamp[s, UTC] with nulls for missing values, name servers
+        and status are list<string> columns.
+
+        :param records: the "records" list of a purchase response, see ApiClient.purchase_raw
+        :param columns: names of the columns to build, all of COLUMNS by default
+    """
+
+    if pyarrow is None:
+        raise ImportError('to_arrow requires pyarrow: pip install whois-history[columnar]')
+
+    arrays = dict()
+
+    for name, (kind, values) in _build_columns(records, columns).items():
+        if kind == 'date':
+            values = [None if v == _nat else v for v in values]
+            arrays[name] = pyarrow.array(values, type=pyarrow.timestamp('s', tz='UTC'))
+        elif kind == 'list':
+            arrays[name] = pyarrow.array(values, type=pyarrow.list_(pyarrow.string()))
+        else:
+            arrays[name] = pyarrow.array(values, type=pyarrow.string())
+
+    return pyarrow.table(arrays)
+
+
+def to_pandas(records: List[dict], columns=None):
+    """Convert response records to a pandas.DataFrame.
+
+        Dates are datetime64 columns in UTC, name servers and status hold
+        lists. The conversion goes through Arrow when pyarrow is installed.
+
+        :param records: the "records" list of a purchase response, see ApiClient.purchase_raw
+        :param columns: names of the columns to build, all of COLUMNS by default
+    """
+
+    if pandas is None:
+        raise ImportError('to_pandas requires pandas: pip install whois-history[columnar]')
+
+    if pyarrow is not None:
+        return to_arrow(records, columns).to_pandas()
+
+    frame = pandas.DataFrame(to_numpy(records, columns))
+    for name in frame.columns:
+        if frame[name].dtype.kind == 'M':
+            frame[name] = frame[name].dt.tz_localize('UTC')
+
+    return frame
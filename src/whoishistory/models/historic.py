@@ -1,20 +1,88 @@
 import datetime
+import functools
+import hashlib
+import json
 import re
 
 re_offset = re.compile(r'(\d\d):(\d\d)$')
+re_iso8601 = re.compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2})T([0-9]{2}):([0-9]{2}):([0-9]{2})([+-])([0-9]{2}):?([0-5][0-9])\Z')
+
+_timezones = dict()
+
+
+def _strptime_datetime(v: str) -> datetime.datetime:
+    v = re_offset.sub(r"\1\2", v)
+    return datetime.datetime.strptime(v, '%Y-%m-%dT%H:%M:%S%z')
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_datetime(v: str) -> datetime.datetime:
+    # Fast path for the fixed format used by the API. Anything else goes
+    # through strptime so results and errors stay the same.
+    m = re_iso8601.match(v)
+    if m is None:
+        return _strptime_datetime(v)
+
+    year, month, day, hour, minute, second, sign, offset_hours, offset_minutes = m.groups()
+
+    offset = int(offset_hours) * 3600 + int(offset_minutes) * 60
+    if sign == '-':
+        offset = -offset
+
+    tz = _timezones.get(offset)
+    if tz is None:
+        tz = datetime.timezone(datetime.timedelta(seconds=offset))
+        _timezones[offset] = tz
+
+    return datetime.datetime(int(year), int(month), int(day), int(hour), int(minute), int(second), tzinfo=tz)
 
 
 def _datetime_value(values: dict, key: str) -> datetime.datetime or None:
     if key in values:
         if values[key] is None:
             return None
-        v = str(values[key])
-        v = re_offset.sub(r"\1\2", v)
-        return datetime.datetime.strptime(v, '%Y-%m-%dT%H:%M:%S%z')
+        return _parse_datetime(str(values[key]))
 
     return None
 
 
+def _datetime_str(value: datetime.datetime or None) -> str or None:
+    if value is None:
+        return None
+    return value.isoformat()
+
+
+def _utc_datetime_str(value: datetime.datetime or None) -> str or None:
+    if value is None:
+        return None
+    return value.astimezone(datetime.timezone.utc).isoformat()
+
+
+def _digest(payload: dict) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _fingerprint(obj) -> str:
+    # Dates are converted to UTC so that equal objects have equal fingerprints
+    try:
+        return obj._fingerprint
+    except AttributeError:
+        pass
+
+    obj._fingerprint = _digest(obj._dict(_utc_datetime_str))
+    return obj._fingerprint
+
+
+def _fingerprints_differ(a, b) -> bool:
+    # Only compares fingerprints that are already computed
+    fa = getattr(a, '_fingerprint', None)
+    if fa is None:
+        return False
+    fb = getattr(b, '_fingerprint', None)
+    return fb is not None and fa != fb
+
+
 def _integer_value(values: dict, key: str) -> int:
     if key in values:
         return int(values[key])
@@ -37,9 +105,23 @@ def _string_list_value(values: dict, key: str) -> list:
     return str_list
 
 
+def _audit_value(values: dict, key: str):
+    if key in values:
+        return Audit(values[key])
+    return ''
+
+
+def _contact_value(values: dict, key: str):
+    if key in values:
+        return Contact(values[key])
+    return None
+
+
 # Audit is a part of whois API response. It represents dates
 # when whois record was added and updated in our database.
 class Audit:
+    __slots__ = ('__dict__', '__weakref__', '_fingerprint')
+
     created_date: datetime.datetime or None
     updated_date: datetime.datetime or None
 
@@ -53,17 +135,45 @@ class Audit:
         self.created_date = _datetime_value(values, 'createdDate')
         self.updated_date = _datetime_value(values, 'updatedDate')
 
+    def to_dict(self) -> dict:
+        """Return the audit in the format of the API response."""
+
+        return self._dict(_datetime_str)
+
+    def _dict(self, datetime_str) -> dict:
+        return {
+            'createdDate': datetime_str(self.created_date),
+            'updatedDate': datetime_str(self.updated_date),
+        }
+
+    def fingerprint(self) -> str:
+        """Return a SHA-256 digest of the audit content, stable across processes.
+
+            It is computed on first call and cached, so the audit must not be
+            modified afterwards. Equal audits have equal fingerprints.
+        """
+
+        return _fingerprint(self)
+
+    def __hash__(self):
+        return int(_fingerprint(self)[:16], 16)
+
     def __str__(self):
         return str(self.__dict__)
 
     def __eq__(self, other):
-        return isinstance(other, Audit) and \
+        if self is other:
+            return True
+
+        return isinstance(other, (Audit, CompactAudit)) and \
                self.created_date == other.created_date and \
                self.updated_date == other.updated_date
 
 
 # Contact is a part of the API response
 class Contact:
+    __slots__ = ('__dict__', '__weakref__', '_fingerprint')
+
     name: str
     organization: str
     street: str
@@ -110,12 +220,37 @@ class Contact:
         self.fax_ext = _string_value(values, 'faxExt')
         self.raw_text = _string_value(values, 'rawText')
 
+    def to_dict(self) -> dict:
+        """Return the contact in the format of the API response."""
+
+        return self._dict(_datetime_str)
+
+    def _dict(self, datetime_str) -> dict:
+        return {key: getattr(self, name) for name, key in zip(_contact_fields, _contact_keys)}
+
+    def fingerprint(self) -> str:
+        """Return a SHA-256 digest of the contact content, stable across processes.
+
+            It is computed on first call and cached, so the contact must not be
+            modified afterwards. Equal contacts have equal fingerprints.
+        """
+
+        return _fingerprint(self)
+
+    def __hash__(self):
+        return int(_fingerprint(self)[:16], 16)
+
     def __str__(self):
         return str(self.__dict__)
 
     def __eq__(self, other):
-        return isinstance(other, Contact) and \
-               self.name == other.name and \
+        if self is other:
+            return True
+
+        if not isinstance(other, (Contact, CompactContact)) or _fingerprints_differ(self, other):
+            return False
+
+        return self.name == other.name and \
                self.organization == other.organization and \
                self.street == other.street and \
                self.city == other.city and \
@@ -132,6 +267,8 @@ class Contact:
 
 # WhoisRecord is a whois record returned by the API
 class WhoisRecord:
+    __slots__ = ('__dict__', '__weakref__', '_fingerprint')
+
     domain_name: str
     domain_type: str
     created_date_iso8601: datetime.datetime or None
@@ -153,6 +290,9 @@ class WhoisRecord:
     billing_contact: Contact or None
     zone_contact: Contact or None
 
+    _audit_type = Audit
+    _contact_type = Contact
+
     def __init__(self, values=None):
         self.domain_name = ''
         self.domain_type = ''
@@ -187,7 +327,7 @@ class WhoisRecord:
         self.updated_date_raw = _string_value(values, 'updatedDateRaw')
         self.expires_date_raw = _string_value(values, 'expiresDateRaw')
         if 'audit' in values:
-            self.audit = Audit(values['audit'])
+            self.audit = self._audit_type(values['audit'])
         self.name_servers = _string_list_value(values, 'nameServers')
         self.whois_server = _string_value(values, 'whoisServer')
         self.registrar_name = _string_value(values, 'registrarName')
@@ -195,22 +335,66 @@ class WhoisRecord:
         self.clean_text = _string_value(values, 'cleanText')
         self.raw_text = _string_value(values, 'rawText')
         if 'registrantContact' in values:
-            self.registrant_contact = Contact(values['registrantContact'])
+            self.registrant_contact = self._contact_type(values['registrantContact'])
         if 'administrativeContact' in values:
-            self.administrative_contact = Contact(values['administrativeContact'])
+            self.administrative_contact = self._contact_type(values['administrativeContact'])
         if 'technicalContact' in values:
-            self.technical_contact = Contact(values['technicalContact'])
+            self.technical_contact = self._contact_type(values['technicalContact'])
         if 'billingContact' in values:
-            self.billing_contact = Contact(values['billingContact'])
+            self.billing_contact = self._contact_type(values['billingContact'])
         if 'zoneContact' in values:
-            self.zone_contact = Contact(values['zoneContact'])
+            self.zone_contact = self._contact_type(values['zoneContact'])
+
+    def to_dict(self) -> dict:
+        """Return the record in the format of the API response.
+
+            Building a record from the result gives an equal record.
+        """
+
+        return self._dict(_datetime_str)
+
+    def _dict(self, datetime_str) -> dict:
+        res = dict()
+
+        for name, key, converter in _whois_record_fields:
+            v = getattr(self, name)
+
+            if converter is _datetime_value:
+                v = datetime_str(v)
+            elif converter is _string_list_value:
+                v = list(v)
+            elif converter is _audit_value or converter is _contact_value:
+                if v is None or v == '':
+                    continue
+                v = v._dict(datetime_str)
+
+            res[key] = v
+
+        return res
+
+    def fingerprint(self) -> str:
+        """Return a SHA-256 digest of the record content, stable across processes.
+
+            It is computed on first call and cached, so the record must not be
+            modified afterwards. Equal records have equal fingerprints.
+        """
+
+        return _fingerprint(self)
+
+    def __hash__(self):
+        return int(_fingerprint(self)[:16], 16)
 
     def __str__(self):
         return str(self.__dict__)
 
     def __eq__(self, other):
-        return isinstance(other, WhoisRecord) and \
-               self.domain_name == other.domain_name and \
+        if self is other:
+            return True
+
+        if not isinstance(other, (WhoisRecord, CompactWhoisRecord)) or _fingerprints_differ(self, other):
+            return False
+
+        return self.domain_name == other.domain_name and \
                self.domain_type == other.domain_type and \
                self.created_date_iso8601 == other.created_date_iso8601 and \
                self.updated_date_iso8601 == other.updated_date_iso8601 and \
@@ -232,6 +416,149 @@ class WhoisRecord:
                self.zone_contact == other.zone_contact
 
 
+# attribute, response key and converter of every WhoisRecord field
+_whois_record_fields = (
+    ('domain_name', 'domainName', _string_value),
+    ('domain_type', 'domainType', _string_value),
+    ('created_date_iso8601', 'createdDateISO8601', _datetime_value),
+    ('updated_date_iso8601', 'updatedDateISO8601', _datetime_value),
+    ('expires_date_iso8601', 'expiresDateISO8601', _datetime_value),
+    ('created_date_raw', 'createdDateRaw', _string_value),
+    ('updated_date_raw', 'updatedDateRaw', _string_value),
+    ('expires_date_raw', 'expiresDateRaw', _string_value),
+    ('audit', 'audit', _audit_value),
+    ('name_servers', 'nameServers', _string_list_value),
+    ('whois_server', 'whoisServer', _string_value),
+    ('registrar_name', 'registrarName', _string_value),
+    ('status', 'status', _string_list_value),
+    ('clean_text', 'cleanText', _string_value),
+    ('raw_text', 'rawText', _string_value),
+    ('registrant_contact', 'registrantContact', _contact_value),
+    ('administrative_contact', 'administrativeContact', _contact_value),
+    ('technical_contact', 'technicalContact', _contact_value),
+    ('billing_contact', 'billingContact', _contact_value),
+    ('zone_contact', 'zoneContact', _contact_value),
+)
+
+_whois_record_names = tuple(name for name, _, _ in _whois_record_fields)
+
+_whois_record_converters = {name: (key, converter) for name, key, converter in _whois_record_fields}
+
+
+# LazyWhoisRecord is a WhoisRecord converting its fields on first access
+# and caching them. It keeps a reference to the response dict.
+class LazyWhoisRecord(WhoisRecord):
+
+    def __init__(self, values=None):
+        self._values = dict() if values is None else values
+
+    def __getattr__(self, name):
+        values = self.__dict__.get('_values')
+        if values is None or name not in _whois_record_converters:
+            raise AttributeError(name)
+
+        key, converter = _whois_record_converters[name]
+        value = converter(values, key)
+        self.__dict__[name] = value
+
+        return value
+
+    def __str__(self):
+        return str({name: getattr(self, name) for name, _, _ in _whois_record_fields})
+
+
+def _slots_dict(obj, names) -> dict:
+    return {name: getattr(obj, name) for name in names}
+
+
+_audit_fields = (
+    'created_date',
+    'updated_date',
+)
+
+
+# CompactAudit is an Audit storing its fields in slots instead of a __dict__
+class CompactAudit:
+    __slots__ = _audit_fields + ('_fingerprint',)
+
+    __init__ = Audit.__init__
+    __eq__ = Audit.__eq__
+    __hash__ = Audit.__hash__
+    to_dict = Audit.to_dict
+    _dict = Audit._dict
+    fingerprint = Audit.fingerprint
+
+    def __str__(self):
+        return str(_slots_dict(self, _audit_fields))
+
+
+_contact_fields = (
+    'name',
+    'organization',
+    'street',
+    'city',
+    'state',
+    'postal_code',
+    'country',
+    'email',
+    'telephone',
+    'telephone_ext',
+    'fax',
+    'fax_ext',
+    'raw_text',
+)
+
+_contact_keys = (
+    'name',
+    'organization',
+    'street',
+    'city',
+    'state',
+    'postalCode',
+    'country',
+    'email',
+    'telephone',
+    'telephoneExt',
+    'fax',
+    'faxExt',
+    'rawText',
+)
+
+
+# CompactContact is a Contact storing its fields in slots instead of a __dict__
+class CompactContact:
+    __slots__ = _contact_fields + ('_fingerprint',)
+
+    __init__ = Contact.__init__
+    __eq__ = Contact.__eq__
+    __hash__ = Contact.__hash__
+    to_dict = Contact.to_dict
+    _dict = Contact._dict
+    fingerprint = Contact.fingerprint
+
+    def __str__(self):
+        return str(_slots_dict(self, _contact_fields))
+
+
+# CompactWhoisRecord is a WhoisRecord storing its fields in slots instead of
+# a __dict__. Nested audit and contacts are CompactAudit and CompactContact.
+class CompactWhoisRecord:
+    __slots__ = _whois_record_names + ('_fingerprint',)
+
+    _audit_type = CompactAudit
+    _contact_type = CompactContact
+
+    __init__ = WhoisRecord.__init__
+    __eq__ = WhoisRecord.__eq__
+    __hash__ = WhoisRecord.__hash__
+    to_dict = WhoisRecord.to_dict
+    _dict = WhoisRecord._dict
+    fingerprint = WhoisRecord.fingerprint
+
+    def __str__(self):
+        return str(_slots_dict(self, _whois_record_names))
+
+
 class ErrorMessage(Exception):
     code: int
     message: str
@@ -0,0 +1,84 @@
+from .historic import WhoisRecord, _whois_record_fields, _contact_fields, \
+    _string_value, _string_list_value, _datetime_value, _audit_value, _contact_value
+
+
+# Interner is a record factory sharing equal values between the records it
+# builds: strings and dates are interned, equal contacts and audits become a
+# single shared instance. Shared values must be treated as read-only.
+class Interner:
+
+    def __init__(self, record_factory=WhoisRecord):
+        """Init Interner instance.
+            :param record_factory: callable building the records before interning,
+                lazy records are fully converted by interning
+        """
+
+        self.record_factory = record_factory
+
+        self._values = dict()
+        self._dates = dict()
+        self._contacts = dict()
+        self._audits = dict()
+
+    def __call__(self, values: dict):
+        return self.intern(self.record_factory(values))
+
+    def value(self, value: str) -> str:
+        """Return the shared instance of a string."""
+
+        return self._values.setdefault(value, value)
+
+    def date(self, value):
+        """Return the shared instance of a date."""
+
+        if value is None:
+            return None
+
+        # equal instants with different offsets must not be merged
+        return self._dates.setdefault((value, value.utcoffset()), value)
+
+    def intern(self, record):
+        """Replace the fields of record with shared instances and return it."""
+
+        value = self.value
+
+        for name, _, converter in _whois_record_fields:
+            v = getattr(record, name)
+
+            if converter is _string_value:
+                setattr(record, name, value(v))
+            elif converter is _datetime_value:
+                setattr(record, name, self.date(v))
+            elif converter is _string_list_value:
+                setattr(record, name, [value(s) for s in v])
+            elif converter is _contact_value:
+                if v is not None:
+                    setattr(record, name, self._contact(v))
+            elif converter is _audit_value:
+                if v != '':
+                    record.audit = self._audit(v)
+
+        return record
+
+    def _contact(self, contact):
+        key = (type(contact),) + tuple(getattr(contact, name) for name in _contact_fields)
+
+        shared = self._contacts.get(key)
+        if shared is None:
+            for name, v in zip(_contact_fields, key[1:]):
+                setattr(contact, name, self.value(v))
+            shared = self._contacts.setdefault(key, contact)
+
+        return shared
+
+    def _audit(self, audit):
+        audit.created_date = self.date(audit.created_date)
+        audit.updated_date = self.date(audit.updated_date)
+
+        key = (type(audit), id(audit.created_date), id(audit.updated_date))
+
+        shared = self._audits.get(key)
+        if shared is None:
+            shared = self._audits.setdefault(key, audit)
+
+        return shared
@@ -0,0 +1,150 @@
+from .historic import WhoisRecord, CompactWhoisRecord, _whois_record_fields, _whois_record_converters, \
+    _contact_fields, _contact_keys, _contact_value, _audit_value, _string_value, _datetime_value, _string_list_value
+
+_contact_names = tuple(name for name, _, converter in _whois_record_fields if converter is _contact_value)
+
+_contact_field_keys = dict(zip(_contact_fields, _contact_keys))
+
+# the raw and clean texts of the record and the raw texts of its contacts
+HEAVY_TEXT_FIELDS = ('raw_text', 'clean_text') + tuple(name + '.raw_text' for name in _contact_names)
+
+
+def _split(name: str) -> tuple:
+    head, _, tail = name.partition('.')
+
+    if head not in _whois_record_converters or (tail and (head not in _contact_names or tail not in _contact_fields)):
+        raise ValueError('unknown field: ' + name)
+
+    return head, tail
+
+
+def _projection(fields, exclude) -> dict:
+    # attribute -> None for the whole value, or the set of kept contact fields
+    if fields is None:
+        kept = {name: None for name, _, _ in _whois_record_fields}
+    else:
+        kept = dict()
+        for head, tail in map(_split, fields):
+            if not tail:
+                kept[head] = None
+            elif kept.get(head, set()) is not None:
+                kept.setdefault(head, set()).add(tail)
+
+    for head, tail in map(_split, exclude or ()):
+        if not tail:
+            kept.pop(head, None)
+        elif head in kept:
+            if kept[head] is None:
+                kept[head] = set(_contact_fields)
+            kept[head].discard(tail)
+
+    return kept
+
+
+def _builder(record_type, kept: dict):
+    # Source of a function building a record_type from the kept fields of a
+    # response dict, like record_type.__init__ without the dropped fields and
+    # without assigning defaults that are overwritten, so it is faster.
+    defaults = record_type()
+    contact = record_type._contact_type()
+
+    lines = ['def build(values):', '    r = new(record_type)']
+    contacts = []
+
+    for name, key, converter in _whois_record_fields:
+        if name not in kept:
+            lines.append('    r.%s = %r' % (name, getattr(defaults, name)))
+        elif converter is _contact_value:
+            builder = 'build_' + name
+            lines.append('    r.%s = %s(values[%r]) if %r in values else None' % (name, builder, key, key))
+            contacts.append((builder, kept[name]))
+        elif converter is _audit_value:
+            lines.append("    r.%s = audit_type(values[%r]) if %r in values else ''" % (name, key, key))
+        else:
+            lines.append('    r.%s = %s(values, %r)' % (name, converter.__name__, key))
+
+    lines.append('    return r')
+
+    for builder, kept_fields in contacts:
+        lines += ['', 'def %s(values):' % builder, '    c = new(contact_type)']
+        for name, key in zip(_contact_fields, _contact_keys):
+            if kept_fields is None or name in kept_fields:
+                lines.append('    c.%s = _string_value(values, %r)' % (name, key))
+            else:
+                lines.append('    c.%s = %r' % (name, getattr(contact, name)))
+        lines.append('    return c')
+
+    namespace = {
+        'new': object.__new__,
+        'record_type': record_type,
+        'audit_type': record_type._audit_type,
+        'contact_type': record_type._contact_type,
+        '_string_value': _string_value,
+        '_datetime_value': _datetime_value,
+        '_string_list_value': _string_list_value,
+    }
+    exec('\n'.join(lines), namespace)
+
+    return namespace['build']
+
+
+# Projection is a record factory building records from a subset of the
+# response fields. The other fields keep their default values, so they
+# are neither converted nor retained. WhoisRecord and CompactWhoisRecord
+# are built directly from the response dict, other record factories from
+# a projected copy of it.
+class Projection:
+
+    def __init__(self, record_factory=WhoisRecord, fields=None, exclude=None):
+        """Init Projection instance.
+            :param record_factory: callable building a record from the projected response dict
+            :param fields: names of the WhoisRecord fields to keep, all by default. Contact
+                fields are given as e.g. 'registrant_contact.email'
+            :param exclude: names of the fields to drop, e.g. HEAVY_TEXT_FIELDS
+        """
+
+        self.record_factory = record_factory
+
+        kept = _projection(fields, exclude)
+
+        self._kept = tuple(key for name, key, _ in _whois_record_fields if name in kept)
+        self._dropped = tuple(key for name, key, _ in _whois_record_fields if name not in kept)
+        # response key and dropped keys of every partially kept contact
+        self._contacts = tuple(
+            (key, tuple(_contact_field_keys[f] for f in _contact_fields if f not in kept[name]))
+            for name, key, _ in _whois_record_fields if kept.get(name) is not None
+        )
+
+        self._build = None
+        if record_factory is WhoisRecord or record_factory is CompactWhoisRecord:
+            self._build = _builder(record_factory, kept)
+
+    def project(self, values: dict) -> dict:
+        """Return the projected copy of a response dict."""
+
+        # copying the dict and removing a few keys is faster than picking many
+        if len(self._kept) < len(self._dropped):
+            res = {key: values[key] for key in self._kept if key in values}
+        else:
+            res = dict(values)
+            for key in self._dropped:
+                res.pop(key, None)
+
+        for key, dropped in self._contacts:
+            contact = res.get(key)
+            if isinstance(contact, dict):
+                contact = dict(contact)
+                for k in dropped:
+                    contact.pop(k, None)
+                res[key] = contact
+
+        return res
+
+    def __call__(self, values: dict = None):
+        if values is None:
+            return self.record_factory()
+
+        if self._build is not None:
+            return self._build(values)
+
+        return self.record_factory(self.project(values))
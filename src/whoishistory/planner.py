@@ -0,0 +1,128 @@
+from typing import Iterable, List
+
+from .batch import BatchResult
+
+# rough size of a record in a purchase response, contacts and raw texts included
+BYTES_PER_RECORD = 4096
+
+
+# PlannedDomain is the outcome of the preview of one domain.
+# records_count is None when the preview failed.
+class PlannedDomain:
+    domain_name: str
+    records_count: int or None
+    error: Exception or None
+
+    def __init__(self, domain_name: str, records_count: int = None, error: Exception = None):
+        self.domain_name = domain_name
+        self.records_count = records_count
+        self.error = error
+
+    def __str__(self):
+        return str(self.__dict__)
+
+
+class Plan:
+    """Purchases selected from the previews of a list of domains.
+
+        purchases are scheduled largest history first, so the longest
+        downloads start early and the workers finish together. Domains
+        without records are skipped, as are the ones whose preview failed
+        and the ones beyond the credit budget, in input order.
+    """
+
+    def __init__(self, purchases: List[PlannedDomain], empty: List[PlannedDomain],
+                 failed: List[PlannedDomain], over_budget: List[PlannedDomain],
+                 credits_per_purchase: int = 1, bytes_per_record: int = BYTES_PER_RECORD, options: dict = None):
+        """Init Plan instance.
+            :param purchases: domains to purchase, in schedule order
+            :param empty: domains without records
+            :param failed: domains whose preview failed
+            :param over_budget: domains left out by the credit budget
+            :param credits_per_purchase: credits charged by a purchase call
+            :param bytes_per_record: estimated size of a record in a response
+            :param options: search options of the previews, used by the purchases
+        """
+
+        self.purchases = purchases
+        self.empty = empty
+        self.failed = failed
+        self.over_budget = over_budget
+        self.credits_per_purchase = credits_per_purchase
+        self.bytes_per_record = bytes_per_record
+        self.options = dict() if options is None else options
+
+    @property
+    def domain_names(self) -> List[str]:
+        return [p.domain_name for p in self.purchases]
+
+    @property
+    def records(self) -> int:
+        return sum(p.records_count for p in self.purchases)
+
+    @property
+    def credits(self) -> int:
+        return len(self.purchases) * self.credits_per_purchase
+
+    @property
+    def estimated_bytes(self) -> int:
+        return self.records * self.bytes_per_record
+
+    @property
+    def largest_response(self) -> int:
+        """Estimated size in bytes of the largest response."""
+
+        if not self.purchases:
+            return 0
+
+        return self.purchases[0].records_count * self.bytes_per_record
+
+    def __str__(self):
+        return str({
+            'purchases': len(self.purchases),
+            'records': self.records,
+            'credits': self.credits,
+            'estimated_bytes': self.estimated_bytes,
+            'empty': len(self.empty),
+            'failed': len(self.failed),
+            'over_budget': len(self.over_budget),
+        })
+
+
+def make_plan(previews: Iterable[BatchResult], budget: int = None, credits_per_purchase: int = 1,
+              bytes_per_record: int = BYTES_PER_RECORD, options: dict = None) -> Plan:
+    """Return the Plan of the results of preview_many.
+
+        :param previews: BatchResult objects of preview_many, in priority order
+        :param budget: maximum number of credits spent, unlimited by default
+        :param credits_per_purchase: credits charged by a purchase call
+        :param bytes_per_record: estimated size of a record in a response
+        :param options: search options of the previews
+    """
+
+    purchases = []
+    empty = []
+    failed = []
+    over_budget = []
+
+    spent = 0
+
+    for r in previews:
+        if not r.ok:
+            failed.append(PlannedDomain(r.domain_name, error=r.error))
+            continue
+
+        planned = PlannedDomain(r.domain_name, r.result)
+
+        if planned.records_count == 0:
+            empty.append(planned)
+        elif budget is not None and spent + credits_per_purchase > budget:
+            over_budget.append(planned)
+        else:
+            spent += credits_per_purchase
+            purchases.append(planned)
+
+    # sorted is stable, equal histories keep their input order
+    purchases = sorted(purchases, key=lambda p: p.records_count, reverse=True)
+
+    return Plan(purchases, empty, failed, over_budget, credits_per_purchase, bytes_per_record, options)
@@ -0,0 +1,133 @@
+import asyncio
+import datetime
+import email.utils
+import random
+import threading
+import time
+
+
+def _is_retryable(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def _retry_after(headers) -> float or None:
+    """Return the delay requested by a Retry-After header in seconds."""
+
+    value = headers.get('Retry-After')
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+
+    return max(0.0, (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+class RateLimiter:
+    """Token bucket shared by threads and asyncio tasks.
+
+        The rate is halved on every 429 response, down to min_rate, and
+        grows back by recovery requests per second on every success, up to
+        the configured rate. A Retry-After header pauses all requests.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: float = None, recovery: float = None):
+        """Init RateLimiter instance.
+            :param rate: maximum number of requests per second
+            :param burst: number of requests allowed at once
+            :param min_rate: lowest rate reached on 429 responses, defaults to rate / 64
+            :param recovery: rate increase per successful request, defaults to rate / 100
+        """
+
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate if min_rate is not None else rate / 64
+        self.recovery = recovery if recovery is not None else rate / 100
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        # Take a token, possibly borrowing it, and return how long to wait for it
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+            return max(wait, self._blocked_until - now)
+
+    def acquire(self):
+        """Block the calling thread until a request may be sent."""
+
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait until a request may be sent without blocking the event loop."""
+
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def throttle(self, retry_after: float = None):
+        """Slow down after a 429 response.
+
+            :param retry_after: seconds to pause all requests
+        """
+
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after is not None:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+    def success(self):
+        """Speed back up after a successful response."""
+
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.recovery)
+
+
+class RetryPolicy:
+    """Retry of 429 and 5xx responses with jittered exponential backoff."""
+
+    def __init__(self, max_retries: int = 3, backoff: float = 0.5, max_backoff: float = 30.0):
+        """Init RetryPolicy instance.
+            :param max_retries: number of retries before ServerErrorException is raised
+            :param backoff: base delay in seconds, doubled on each retry
+            :param max_backoff: maximum delay in seconds
+        """
+
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def delay(self, attempt: int, retry_after: float = None) -> float:
+        """Return the delay before retry number attempt, counting from 0.
+
+            :param attempt: number of retries already made
+            :param retry_after: delay requested by the server
+        """
+
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        return delay
@@ -1,28 +1,123 @@
 import requests
 import logging
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from .exceptions import ServerErrorException
+from .metrics import Metrics
+from .rate_limiter import RateLimiter, RetryPolicy, _is_retryable, _retry_after
+
+# content codings urllib3 can decode: gzip and deflate, plus br and zstd
+# when brotli and zstandard are installed
+ACCEPT_ENCODING = make_headers(accept_encoding=True)['accept-encoding']
+
+
+def _wire_bytes(response) -> int or None:
+    # urllib3 counts the bytes read from the connection, before decoding
+    tell = getattr(response.raw, 'tell', None)
+    if tell is None:
+        return None
+
+    n = tell()
+    return n if isinstance(n, int) else None
+
+
+class TransferStats:
+    """Bytes received over the wire and after decompression."""
+
+    def __init__(self):
+        self.responses = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+
+        self._lock = threading.Lock()
+
+    def add(self, wire_bytes: int or None, decoded_bytes: int):
+        """Count a response body, wire_bytes defaults to decoded_bytes when unknown."""
+
+        with self._lock:
+            self.responses += 1
+            self.wire_bytes += decoded_bytes if wire_bytes is None else wire_bytes
+            self.decoded_bytes += decoded_bytes
+
+    @property
+    def compression_ratio(self) -> float:
+        return self.decoded_bytes / self.wire_bytes if self.wire_bytes else 1.0
+
+    def __str__(self):
+        return str({
+            'responses': self.responses,
+            'wire_bytes': self.wire_bytes,
+            'decoded_bytes': self.decoded_bytes,
+        })
 
 
 class Requester(object):
     _logger_marker = 'whoishistory-requester'
 
-    def __init__(self, user_agent):
+    def __init__(self, user_agent, pool_connections: int = 10, pool_maxsize: int = 10,
+                 max_retries: int = 0, pool_block: bool = False, session: requests.Session = None,
+                 rate_limiter: RateLimiter = None, retry_policy: RetryPolicy = None, compress: bool = True,
+                 metrics: Metrics = None):
         """Initialise an instance of Requester with given api_key and user_agent string
 
+            The requester owns a requests.Session so keep-alive connections
+            are reused between calls. The session may be shared across threads;
+            size pool_maxsize to the number of threads issuing requests.
+
             Keyword arguments:
             :param user_agent: user Agent header
+            :param pool_connections: number of per-host connection pools to cache
+            :param pool_maxsize: maximum number of connections kept per host
+            :param max_retries: number of retries on connection errors
+            :param pool_block: block when no free connection is available
+                instead of opening a throwaway one
+            :param session: use the given session instead of creating one
+            :param rate_limiter: limiter shared by the requests, slowed down by 429 responses
+            :param retry_policy: retries of 429 and 5xx responses, without it
+                ServerErrorException is raised on the first one
+            :param compress: accept compressed responses, see ACCEPT_ENCODING.
+                Bytes received are counted in transfer_stats
+            :param metrics: receiver of timings, sizes and errors, see whoishistory.metrics
         """
 
         self.user_agent = user_agent
 
         self.logger = logging.getLogger(self._logger_marker)
 
-    def request(self, url, method: str = "GET", headers: dict = None, params: dict = None) -> requests.Response:
+        if session is None:
+            session = requests.Session()
+
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                max_retries=max_retries,
+                pool_block=pool_block,
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+
+        self.session = session
+
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+
+        self.accept_encoding = ACCEPT_ENCODING if compress else 'identity'
+        self.transfer_stats = TransferStats()
+
+        self.metrics = metrics
+
+    def request(self, url, method: str = "GET", headers: dict = None, params: dict = None,
+                stream: bool = False) -> requests.Response:
         """Perform a http(s) request for given parameters to given URL
 
             :param url: API url
             :param method: http method
             :param params: query parameters
             :param headers: query headers
+            :param stream: do not download the body before returning,
+                the caller must close the response and count it with count_transfer
         """
 
         if headers is None:
@@ -33,7 +128,87 @@ class Requester(object):
 
         headers.update({
             'Accept': 'application/json',
+            'Accept-Encoding': self.accept_encoding,
             'User-Agent': self.user_agent,
         })
 
-        return requests.request(method, url, headers=headers, params=params)
+        attempt = 0
+
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            if self.metrics is not None:
+                started = time.perf_counter()
+
+            try:
+                response = self.session.request(method, url, headers=headers, params=params, stream=stream)
+            except Exception as e:
+                if self.metrics is not None:
+                    self.metrics.error('request', e)
+                raise
+
+            if self.metrics is not None:
+                self._observe(response, time.perf_counter() - started, stream)
+
+            if not _is_retryable(response.status_code):
+                if self.rate_limiter is not None:
+                    self.rate_limiter.success()
+                if not stream:
+                    self.count_transfer(response, len(response.content))
+                return response
+
+            retry_after = _retry_after(response.headers)
+
+            if response.status_code == 429 and self.rate_limiter is not None:
+                self.rate_limiter.throttle(retry_after)
+
+            if self.retry_policy is None or attempt >= self.retry_policy.max_retries:
+                error = ServerErrorException(response.status_code, response.text)
+                if self.metrics is not None:
+                    self.metrics.error('request', error)
+                raise error
+
+            response.close()
+
+            delay = self.retry_policy.delay(attempt, retry_after)
+            if self.metrics is not None:
+                self.metrics.retry(response.status_code, delay)
+            self.logger.warning('%s %s returned %d, retrying in %.1fs', method, url, response.status_code, delay)
+            time.sleep(delay)
+
+            attempt += 1
+
+    def count_transfer(self, response: requests.Response, decoded_bytes: int):
+        """Add a response body to transfer_stats.
+
+            :param response: the response, once its body has been read
+            :param decoded_bytes: size of the body after decompression
+        """
+
+        wire_bytes = _wire_bytes(response)
+
+        self.transfer_stats.add(wire_bytes, decoded_bytes)
+
+        if self.metrics is not None:
+            self.metrics.transferred(wire_bytes, decoded_bytes)
+
+    def _observe(self, response: requests.Response, seconds: float, stream: bool):
+        # requests measures the time until the headers are parsed, the body
+        # of a non-streamed response is read after that
+        ttfb = response.elapsed.total_seconds()
+        self.metrics.timing('ttfb', ttfb)
+
+        if not stream:
+            self.metrics.timing('download', max(0.0, seconds - ttfb))
+
+    def close(self):
+        """Close the session and release pooled connections."""
+
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
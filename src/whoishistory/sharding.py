@@ -0,0 +1,102 @@
+import datetime
+import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+# search options bounding the windows of each date field
+SHARD_OPTIONS = {
+    'created': ('createdDateFrom', 'createdDateTo'),
+    'updated': ('updatedDateFrom', 'updatedDateTo'),
+    'expired': ('expiredDateFrom', 'expiredDateTo'),
+}
+
+# windows start at the first domain registrations and end ten years from now
+MIN_DATE = datetime.date(1985, 1, 1)
+MAX_YEARS = 10
+
+
+def date_range(shard_by: str, options: dict) -> tuple:
+    """Return the first and last day searched by options on the shard_by date field."""
+
+    if shard_by not in SHARD_OPTIONS:
+        raise ValueError('unknown shard field: ' + shard_by)
+
+    date_from, date_to = SHARD_OPTIONS[shard_by]
+
+    today = datetime.date.today()
+
+    lo = options.get(date_from, MIN_DATE)
+    hi = options.get(date_to, today.replace(year=today.year + MAX_YEARS, day=1))
+
+    return lo, hi
+
+
+def split_windows(count: Callable, lo: datetime.date, hi: datetime.date, max_records: int,
+                  max_workers: int = 4) -> List[tuple]:
+    """Bisect the days from lo to hi until every window has at most max_records records.
+
+        Windows are previewed level by level, the ones of a level concurrently.
+        A single day with more records is kept as it is. Empty windows are
+        dropped. Returns (first day, last day, number of records) tuples in
+        date order.
+
+        :param count: callable returning the number of records between two days, both included
+        :param lo: first day
+        :param hi: last day
+        :param max_records: maximum number of records of a window
+        :param max_workers: number of concurrent previews
+    """
+
+    windows = []
+    level = [(lo, hi)]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while level:
+            counts = list(executor.map(lambda w: count(*w), level))
+
+            next_level = []
+            for (first, last), n in zip(level, counts):
+                if n == 0:
+                    continue
+
+                if n <= max_records or first == last:
+                    windows.append((first, last, n))
+                    continue
+
+                middle = first + (last - first) // 2
+                next_level.append((first, middle))
+                next_level.append((middle + datetime.timedelta(days=1), last))
+
+            level = next_level
+
+    return sorted(windows)
+
+
+def _canonical(values: dict) -> str:
+    return json.dumps(values, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def merge_shards(shards: List[list]) -> list:
+    """Concatenate the response dicts of shards, without the ones repeated by overlapping shards.
+
+        Records are compared by their whole content. A record is kept as
+        many times as it occurs in the shard where it occurs most, so
+        records repeated within the history are preserved.
+    """
+
+    merged = []
+    seen = Counter()
+
+    for records in shards:
+        occurrences = Counter()
+
+        for r in records:
+            key = _canonical(r)
+            occurrences[key] += 1
+            if occurrences[key] > seen[key]:
+                merged.append(r)
+
+        seen |= occurrences
+
+    return merged
@@ -0,0 +1,56 @@
+import threading
+from typing import Callable
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls sharing a key into a single execution.
+
+        While a call for a key is running, other callers with the same key
+        wait for it and receive its result or exception.
+    """
+
+    def __init__(self):
+        self._calls = dict()
+        self._lock = threading.Lock()
+
+    def do(self, key, fn: Callable):
+        """Run fn unless a call for key is already in flight, then return its result.
+
+            :param key: hashable key identifying identical calls
+            :param fn: callable without arguments
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def __len__(self):
+        return len(self._calls)
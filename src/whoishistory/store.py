@@ -0,0 +1,188 @@
+import datetime
+import json
+import sqlite3
+import threading
+from typing import Iterable, List
+
+from .models.historic import WhoisRecord, _parse_datetime, _utc_datetime_str as _utc_str
+from .models.projection import Projection
+
+
+def _audit_date(record, name: str) -> datetime.datetime or None:
+    return getattr(record.audit, name, None)
+
+
+def _projects(record_factory) -> bool:
+    # factories wrapping other ones, e.g. Interner, keep them as record_factory
+    while record_factory is not None:
+        if isinstance(record_factory, Projection):
+            return True
+        record_factory = getattr(record_factory, 'record_factory', None)
+
+    return False
+
+
+class HistoryStore:
+    """Local SQLite store of historic WHOIS records.
+
+        Records are de-duplicated by content and indexed by domain,
+        registrar and dates. sync fetches only the records added since
+        the latest stored one.
+    """
+
+    def __init__(self, path: str, client=None):
+        """Init HistoryStore instance.
+            :param path: database file, created if missing
+            :param client: ApiClient used by sync
+        """
+
+        self.path = path
+        self.client = client
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS records (
+                fingerprint TEXT PRIMARY KEY,
+                domain TEXT NOT NULL,
+                registrar TEXT NOT NULL,
+                created_date TEXT,
+                updated_date TEXT,
+                expires_date TEXT,
+                audit_created_date TEXT,
+                audit_updated_date TEXT,
+                payload TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS records_domain ON records (domain, audit_updated_date);
+            CREATE INDEX IF NOT EXISTS records_registrar ON records (registrar);
+            CREATE INDEX IF NOT EXISTS records_created_date ON records (created_date);
+            CREATE INDEX IF NOT EXISTS records_updated_date ON records (updated_date);
+            CREATE INDEX IF NOT EXISTS records_expires_date ON records (expires_date);
+        ''')
+
+    def add(self, domain_name: str, records: Iterable[WhoisRecord]) -> int:
+        """Store records of a domain, skipping those already stored. Returns the number added.
+
+            Records are identified by their fingerprint, so they must have all
+            their fields: projected records would be stored incomplete and
+            different records could be taken for the same one.
+
+            :param domain_name: the domain the records were purchased for
+            :param records: the records
+        """
+
+        domain_name = domain_name.lower()
+        rows = []
+
+        for r in records:
+            payload = r.to_dict()
+            rows.append((
+                r.fingerprint(),
+                domain_name,
+                r.registrar_name,
+                _utc_str(r.created_date_iso8601),
+                _utc_str(r.updated_date_iso8601),
+                _utc_str(r.expires_date_iso8601),
+                _utc_str(_audit_date(r, 'created_date')),
+                _utc_str(_audit_date(r, 'updated_date')),
+                json.dumps(payload, ensure_ascii=False),
+            ))
+
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany('INSERT OR IGNORE INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            return self._db.total_changes - before
+
+    def latest_audit_date(self, domain_name: str) -> datetime.datetime or None:
+        """Return the latest audit.updated_date stored for a domain."""
+
+        with self._lock:
+            row = self._db.execute('SELECT MAX(audit_updated_date) FROM records WHERE domain = ?',
+                                   (domain_name.lower(),)).fetchone()
+
+        if row[0] is None:
+            return None
+
+        return _parse_datetime(row[0])
+
+    def sync(self, domain_name: str, **options) -> int:
+        """Purchase the records added since the latest stored one and store them.
+
+            The first sync of a domain purchases its whole history. Returns the
+            number of new records. A sinceDate later than the latest stored
+            record is kept. Projections are rejected, see add.
+
+            :param domain_name: the domain to refresh
+            :key record_factory: callable building the records before they are stored
+            :key sinceDate: purchase records discovered since the given date at the earliest, a datetime stands for its date
+        """
+
+        if self.client is None:
+            raise ValueError('HistoryStore.sync requires a client')
+
+        if options.get('fields') is not None or options.get('exclude') is not None or \
+                _projects(options.get('record_factory')):
+            raise ValueError('HistoryStore stores whole records, fields and exclude are not supported')
+
+        if isinstance(options.get('sinceDate'), datetime.datetime):
+            options['sinceDate'] = options['sinceDate'].date()
+
+        latest = self.latest_audit_date(domain_name)
+        if latest is not None and (options.get('sinceDate') is None or options['sinceDate'] < latest.date()):
+            options['sinceDate'] = latest.date()
+
+        return self.add(domain_name, self.client.purchase(domain_name, **options))
+
+    def records(self, domain_name: str, since: datetime.datetime = None, record_factory=WhoisRecord) -> List:
+        """Return the stored records of a domain ordered by audit.updated_date.
+
+            :param domain_name: the domain
+            :param since: only records updated in the database at or after this time
+            :param record_factory: callable building a record from its response dict
+        """
+
+        query = 'SELECT payload FROM records WHERE domain = ?'
+        args = [domain_name.lower()]
+
+        if since is not None:
+            query += ' AND audit_updated_date >= ?'
+            args.append(_utc_str(since))
+
+        return self._query(query + ' ORDER BY audit_updated_date, fingerprint', args, record_factory)
+
+    def by_registrar(self, registrar_name: str, record_factory=WhoisRecord) -> List:
+        """Return the stored records of every domain with the given registrar."""
+
+        return self._query('SELECT payload FROM records WHERE registrar = ? ORDER BY domain, audit_updated_date',
+                           [registrar_name], record_factory)
+
+    def domains(self) -> List[str]:
+        """Return the stored domains."""
+
+        with self._lock:
+            return [row[0] for row in self._db.execute('SELECT DISTINCT domain FROM records ORDER BY domain')]
+
+    def count(self, domain_name: str = None) -> int:
+        """Return the number of stored records, of one domain or of all."""
+
+        with self._lock:
+            if domain_name is None:
+                return self._db.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+            return self._db.execute('SELECT COUNT(*) FROM records WHERE domain = ?',
+                                    (domain_name.lower(),)).fetchone()[0]
+
+    def _query(self, query: str, args: list, record_factory) -> List:
+        with self._lock:
+            rows = self._db.execute(query, args).fetchall()
+
+        return [record_factory(json.loads(row[0])) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
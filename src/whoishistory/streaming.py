@@ -0,0 +1,271 @@
+import codecs
+import re
+from json.decoder import JSONDecoder, scanstring
+from typing import Iterable, Iterator, List
+
+from .exceptions import UnparsableResponseException, EmptyResponseException
+from .json_backend import BACKENDS, get_loads
+from .models.historic import ErrorMessage
+
+_re_whitespace = re.compile(r'[ \t\n\r]*')
+_re_container_special = re.compile(r'["{}\[\]]')
+_re_scalar_end = re.compile(r'[,}\]\s]')
+
+_raw_decode = JSONDecoder().raw_decode
+
+# returned by RecordsStream._decode_value for a value not complete in the buffer
+_INCOMPLETE = object()
+
+
+def _string_end(buf: str, start: int) -> int or None:
+    try:
+        return scanstring(buf, start + 1)[1]
+    except ValueError:
+        return None
+
+
+class RecordsStream:
+    """Incremental parser for a purchase response body.
+
+        Elements of the top-level "records" array are decoded one by one as
+        soon as they are complete, so only the element being read is kept in
+        memory. Other top-level members are collected in head.
+
+        With the JSON backends of whoishistory.json_backend, a value complete
+        in the buffer is decoded in a single pass by json.JSONDecoder.raw_decode.
+        The end of the other values is scanned for before they are decoded,
+        which makes them about five times slower.
+    """
+
+    def __init__(self, encoding: str = 'utf-8', loads=None):
+        """Init RecordsStream instance.
+            :param encoding: encoding of the body
+            :param loads: function parsing an element, see whoishistory.json_backend
+        """
+
+        self.head = dict()
+
+        self._loads = get_loads(loads)
+        # other callables decode the values they are given, found by scanning
+        self._decode_at_once = self._loads in BACKENDS.values()
+
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._buf = ''
+        self._pos = 0
+        self._state = 'start'
+        self._key = None
+        self._empty = True
+
+        # scanning state of the value being read
+        self._start = None
+        self._depth = 0
+        self._scanning = False
+
+    def feed(self, chunk: bytes) -> List[dict]:
+        """Consume a chunk of the body and return the records it completed."""
+
+        try:
+            text = self._decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            raise UnparsableResponseException(e.__str__())
+
+        if len(text) == 0:
+            return []
+
+        self._empty = False
+        self._buf += text
+
+        try:
+            return self._parse()
+        finally:
+            keep = self._pos if self._start is None else self._start
+            self._buf = self._buf[keep:]
+            self._pos -= keep
+            if self._start is not None:
+                self._start -= keep
+
+    def close(self):
+        """Finish parsing, raising the exceptions ApiClient.purchase would."""
+
+        try:
+            self._decoder.decode(b'', final=True)
+        except UnicodeDecodeError as e:
+            raise UnparsableResponseException(e.__str__())
+
+        if self._empty:
+            raise EmptyResponseException()
+
+        if self._state != 'done':
+            raise UnparsableResponseException('unexpected end of response')
+
+        if 'code' in self.head or 'messages' in self.head:
+            raise ErrorMessage(self.head)
+
+        if 'records' not in self.head:
+            raise EmptyResponseException()
+
+    def _next_char(self) -> str or None:
+        self._pos = _re_whitespace.match(self._buf, self._pos).end()
+        if self._pos >= len(self._buf):
+            return None
+        return self._buf[self._pos]
+
+    def _expect(self, char: str, chars: str):
+        if char not in chars:
+            raise UnparsableResponseException('unexpected character %r at top level' % char)
+        self._pos += 1
+
+    def _parse(self) -> List[dict]:
+        res = []
+
+        while True:
+            if self._start is not None:
+                if not self._scanning and self._decode_at_once and self._buf[self._start] in '{["':
+                    value = self._decode_value()
+                else:
+                    value = _INCOMPLETE
+
+                if value is _INCOMPLETE:
+                    self._scanning = True
+                    if not self._scan_value():
+                        return res
+                    value = self._take_value()
+
+                if self._state == 'key':
+                    if not isinstance(value, str):
+                        raise UnparsableResponseException('object key expected')
+                    self._key = value
+                    self._state = 'colon'
+                elif self._state == 'value':
+                    self.head[self._key] = value
+                    self._state = 'comma'
+                else:
+                    res.append(value)
+                    self._state = 'item_comma'
+                continue
+
+            c = self._next_char()
+            if c is None:
+                return res
+
+            if self._state == 'done':
+                raise UnparsableResponseException('unexpected data after response')
+
+            if self._state == 'start':
+                self._expect(c, '{')
+                self._state = 'first_key'
+            elif self._state in ('first_key', 'key'):
+                if c == '}' and self._state == 'first_key':
+                    self._pos += 1
+                    self._state = 'done'
+                else:
+                    self._state = 'key'
+                    self._begin_value(c)
+            elif self._state == 'colon':
+                self._expect(c, ':')
+                self._state = 'value'
+            elif self._state == 'value':
+                if self._key == 'records' and c == '[':
+                    self.head['records'] = []
+                    self._pos += 1
+                    self._state = 'first_item'
+                else:
+                    self._begin_value(c)
+            elif self._state == 'comma':
+                self._expect(c, ',}')
+                self._state = 'key' if c == ',' else 'done'
+            elif self._state in ('first_item', 'item'):
+                if c == ']' and self._state == 'first_item':
+                    self._pos += 1
+                    self._state = 'comma'
+                else:
+                    self._state = 'item'
+                    self._begin_value(c)
+            elif self._state == 'item_comma':
+                self._expect(c, ',]')
+                self._state = 'item' if c == ',' else 'comma'
+
+    def _begin_value(self, c: str):
+        self._start = self._pos
+        self._depth = 0
+        self._scanning = False
+
+        if c in '{[':
+            self._depth = 1
+            self._pos += 1
+
+    def _scan_value(self) -> bool:
+        buf = self._buf
+        pos = self._pos
+
+        if self._depth == 0:
+            if buf[self._start] == '"':
+                end = _string_end(buf, self._start)
+                if end is None:
+                    return False
+                self._pos = end
+                return True
+
+            m = _re_scalar_end.search(buf, pos)
+            if m is None:
+                self._pos = len(buf)
+                return False
+            self._pos = m.start()
+            return True
+
+        while True:
+            m = _re_container_special.search(buf, pos)
+            if m is None:
+                self._pos = len(buf)
+                return False
+            c = m.group()
+            if c == '"':
+                # strings are scanned whole and rescanned when incomplete
+                end = _string_end(buf, m.start())
+                if end is None:
+                    self._pos = pos
+                    return False
+                pos = end
+            elif c == '{' or c == '[':
+                self._depth += 1
+                pos = m.end()
+            else:
+                self._depth -= 1
+                pos = m.end()
+                if self._depth == 0:
+                    self._pos = pos
+                    return True
+
+    def _decode_value(self):
+        # a container or string is complete once it decodes, a number could
+        # still go on in the next chunk
+        try:
+            value, end = _raw_decode(self._buf, self._start)
+        except ValueError:
+            return _INCOMPLETE
+
+        self._pos = end
+        self._start = None
+
+        return value
+
+    def _take_value(self):
+        text = self._buf[self._start:self._pos]
+        self._start = None
+
+        try:
+            return self._loads(text)
+        except Exception as e:
+            raise UnparsableResponseException(e.__str__())
+
+
+def iter_records(chunks: Iterable[bytes], loads=None) -> Iterator[dict]:
+    """Yield the elements of the "records" array of a streamed purchase response."""
+
+    stream = RecordsStream(loads=loads)
+
+    for chunk in chunks:
+        for r in stream.feed(chunk):
+            yield r
+
+    stream.close()
@@ -0,0 +1,4 @@
+__all__ = ['StubServer', 'synthetic_records', 'synthetic_response']
+
+from .server import StubServer
+from .synthetic import synthetic_records, synthetic_response
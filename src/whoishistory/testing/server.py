@@ -0,0 +1,306 @@
+"""Local stand-in for the WHOIS History API, for load tests and benchmarks.
+
+    Usage: python -m whoishistory.testing.server [--port 8080] [--records 1000] [--latency 0.05]
+"""
+import argparse
+import datetime
+import gzip
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit, parse_qs
+
+from ..api_client import _search_options
+from .synthetic import synthetic_records
+
+# response field holding the date compared with each search option,
+# records without it are not selected by a filter on it
+_filters = {
+    'sinceDate': ('audit', 'updatedDate', '>='),
+    'createdDateFrom': (None, 'createdDateISO8601', '>='),
+    'createdDateTo': (None, 'createdDateISO8601', '<='),
+    'updatedDateFrom': (None, 'updatedDateISO8601', '>='),
+    'updatedDateTo': (None, 'updatedDateISO8601', '<='),
+    'expiredDateFrom': (None, 'expiresDateISO8601', '>='),
+    'expiredDateTo': (None, 'expiresDateISO8601', '<='),
+}
+
+
+class _ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _record_date(record: dict, options: tuple) -> str or None:
+    container, key, _ = options
+    if container is not None:
+        record = record.get(container) or {}
+
+    value = record.get(key)
+    # ISO-8601 dates compare as strings on their date part
+    return value[:10] if isinstance(value, str) and value else None
+
+
+def _select(records: list, filters: dict) -> list:
+    for option, day in filters.items():
+        spec = _filters[option]
+        if spec[2] == '>=':
+            records = [r for r in records if (_record_date(r, spec) or '') >= day]
+        else:
+            records = [r for r in records if (_record_date(r, spec) or '9999') <= day]
+
+    return records
+
+
+# _TokenBucket holds up to one second of requests, and at least one request
+# so that rates below one request per second are served.
+class _TokenBucket:
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.stub.handle(self)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _HTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class StubServer:
+    """Threaded HTTP server speaking the preview and purchase contract of the API.
+
+        Domains are served from the given histories, or from seeded synthetic
+        records otherwise, so preview and purchase of a domain agree. Search
+        options filter the records and errors use the code/messages shape.
+        Latency, bandwidth, rate limiting and injected 5xx responses simulate
+        a loaded service.
+    """
+
+    path = '/api/v1'
+
+    def __init__(self, histories: dict = None, records: int = 100, seed: int = 1, latency: float = 0.0,
+                 bandwidth: float = None, rate_limit: float = None, retry_after: int = 1, error_rate: float = 0.0,
+                 error_status: int = 503, api_keys=None, host: str = '127.0.0.1', port: int = 0):
+        """Init StubServer instance.
+            :param histories: records in response format keyed by domain name
+            :param records: number of synthetic records of domains missing from histories
+            :param seed: seed of the synthetic records and of the injected errors
+            :param latency: seconds waited before answering
+            :param bandwidth: maximum number of body bytes sent per second by each response
+            :param rate_limit: number of requests per second accepted, others get 429
+            :param retry_after: Retry-After header of 429 responses
+            :param error_rate: probability of answering error_status
+            :param error_status: status of the injected errors
+            :param api_keys: accepted API keys, any by default
+            :param host: interface to listen on
+            :param port: port to listen on, a free one by default
+        """
+
+        self.histories = {k.lower(): v for k, v in (histories or {}).items()}
+        self.records = records
+        self.seed = seed
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.api_keys = None if api_keys is None else set(api_keys)
+
+        self.requests = 0
+        self.statuses = dict()
+
+        self._limiter = None if rate_limit is None else _TokenBucket(rate_limit)
+        self._random = random.Random(seed)
+        self._synthetic = dict()
+        self._lock = threading.Lock()
+
+        self._server = _HTTPServer((host, port), _Handler)
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """URL to pass to ApiClient."""
+
+        host, port = self._server.server_address[:2]
+        return 'http://%s:%d%s' % (host, port, self.path)
+
+    def history(self, domain_name: str) -> list:
+        """Return all the records served for a domain."""
+
+        domain_name = domain_name.lower()
+
+        if domain_name in self.histories:
+            return self.histories[domain_name]
+
+        with self._lock:
+            records = self._synthetic.get(domain_name)
+            if records is None:
+                seed = zlib.crc32(domain_name.encode('utf-8')) ^ self.seed
+                records = self._synthetic[domain_name] = synthetic_records(self.records, seed, domain_name)
+
+        return records
+
+    def respond(self, query: dict) -> dict:
+        """Return the response body of a query, or raise _ApiError."""
+
+        if self.api_keys is not None and query.get('apiKey') not in self.api_keys:
+            raise _ApiError(403, 'Access restricted. Check the credits balance or enter the correct API key.')
+
+        domain_name = query.get('domainName', '')
+        if not domain_name:
+            raise _ApiError(422, 'domainName is required')
+
+        filters = dict()
+        for option in _search_options:
+            if option in query:
+                try:
+                    datetime.datetime.strptime(query[option], '%Y-%m-%d')
+                except ValueError:
+                    raise _ApiError(422, option + ' must be a date as YYYY-MM-DD')
+                filters[option] = query[option]
+
+        records = _select(self.history(domain_name), filters)
+
+        mode = query.get('mode', 'preview')
+        if mode == 'preview':
+            return {'recordsCount': len(records)}
+        if mode == 'purchase':
+            return {'recordsCount': len(records), 'records': records}
+
+        raise _ApiError(422, 'mode must be preview or purchase')
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        url = urlsplit(handler.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        headers = {'Content-Type': 'application/json'}
+
+        with self._lock:
+            self.requests += 1
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if url.path.rstrip('/') != self.path:
+            status, body = 404, {'code': 404, 'messages': 'Not found'}
+        elif self._limiter is not None and not self._limiter.take():
+            status, body = 429, {'code': 429, 'messages': 'Too many requests'}
+            headers['Retry-After'] = str(self.retry_after)
+        elif fail:
+            status, body = self.error_status, {'code': self.error_status, 'messages': 'Injected error'}
+        else:
+            try:
+                status, body = 200, self.respond(query)
+            except _ApiError as e:
+                status, body = e.status, {'code': e.status, 'messages': e.message}
+
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+        self._send(handler, status, headers, json.dumps(body).encode('utf-8'))
+
+    def _send(self, handler: BaseHTTPRequestHandler, status: int, headers: dict, data: bytes):
+        if 'gzip' in handler.headers.get('Accept-Encoding', ''):
+            data = gzip.compress(data, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+
+        handler.send_response(status)
+        for k, v in headers.items():
+            handler.send_header(k, v)
+        handler.send_header('Content-Length', str(len(data)))
+        handler.end_headers()
+
+        if self.bandwidth is None:
+            handler.wfile.write(data)
+            return
+
+        # send 10 chunks per second at most
+        chunk_size = max(1, int(self.bandwidth / 10))
+        for i in range(0, len(data), chunk_size):
+            handler.wfile.write(data[i:i + chunk_size])
+            handler.wfile.flush()
+            time.sleep(chunk_size / self.bandwidth)
+
+    def start(self) -> 'StubServer':
+        """Serve in a background thread."""
+
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local stand-in for the WHOIS History API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--histories', help='JSON file of records keyed by domain name')
+    parser.add_argument('--records', type=int, default=100, help='number of synthetic records per domain')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds waited before answering')
+    parser.add_argument('--bandwidth', type=float, help='bytes per second sent by each response')
+    parser.add_argument('--rate-limit', type=float, help='requests per second accepted before answering 429')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='probability of an injected error')
+    parser.add_argument('--error-status', type=int, default=503)
+    args = parser.parse_args(argv)
+
+    histories = None
+    if args.histories:
+        with open(args.histories, encoding='utf-8') as f:
+            histories = json.load(f)
+
+    server = StubServer(histories, args.records, args.seed, args.latency, args.bandwidth, args.rate_limit,
+                        error_rate=args.error_rate, error_status=args.error_status, host=args.host, port=args.port)
+
+    print('serving on ' + server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
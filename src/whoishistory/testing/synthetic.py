@@ -0,0 +1,66 @@
+"""Seeded generators of realistic purchase responses for tests and benchmarks."""
+import json
+import random
+
+
+def synthetic_records(count: int, seed: int = 1, domain_name: str = 'example.test', contacts: int = 5) -> list:
+    """Return count records of a domain in the format of a purchase response.
+
+        Records of the same seed are identical. Contacts are drawn from a pool
+        of the given size, dates, name servers, registrar and text lengths vary
+        from record to record.
+    """
+
+    rnd = random.Random(seed)
+
+    def contact(i):
+        return {
+            'name': 'Contact %d' % i,
+            'organization': 'Organization %d' % i,
+            'street': '%d Main St' % i,
+            'city': 'City',
+            'state': 'ST',
+            'postalCode': '%05d' % i,
+            'country': 'UNITED STATES',
+            'email': 'contact%d@example.test' % i,
+            'telephone': '+1.%010d' % i,
+            'rawText': 'Registrant Name: Contact %d\nRegistrant Organization: Organization %d\n' % (i, i),
+        }
+
+    records = []
+    for i in range(count):
+        date = '20%02d-%02d-%02dT%02d:%02d:%02d+00:00' % (
+            rnd.randrange(1, 21), rnd.randrange(1, 13), rnd.randrange(1, 29),
+            rnd.randrange(24), rnd.randrange(60), rnd.randrange(60))
+        records.append({
+            'domainName': domain_name,
+            'domainType': 'added',
+            'createdDateISO8601': date,
+            'updatedDateISO8601': date,
+            'expiresDateISO8601': date,
+            'createdDateRaw': date,
+            'updatedDateRaw': date,
+            'expiresDateRaw': date,
+            'audit': {'createdDate': date, 'updatedDate': date},
+            'nameServers': ['ns%d.%s' % (n, domain_name) for n in range(rnd.randrange(1, 5))],
+            'whoisServer': 'whois.example.test',
+            'registrarName': 'Registrar %d' % rnd.randrange(10),
+            'status': ['clientTransferProhibited'],
+            'cleanText': 'Updated Date: %s\n' % date + 'Domain Name: %s\n' % domain_name * rnd.randrange(5, 20),
+            'rawText': 'Updated Date: %s\n' % date + 'Domain Name: %s\n' % domain_name * rnd.randrange(10, 40),
+            'registrantContact': contact(rnd.randrange(contacts)),
+            'administrativeContact': contact(rnd.randrange(contacts)),
+            'technicalContact': contact(rnd.randrange(contacts)),
+            'billingContact': contact(rnd.randrange(contacts)),
+            'zoneContact': contact(rnd.randrange(contacts)),
+        })
+
+    return records
+
+
+def synthetic_response(count: int, seed: int = 1, **options) -> bytes:
+    """Return a purchase response body with count synthetic records, see synthetic_records."""
+
+    records = synthetic_records(count, seed, **options)
+
+    return json.dumps({'recordsCount': len(records), 'records': records}).encode('utf-8')
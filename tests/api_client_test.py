@@ -1,33 +1,14 @@
-import io
-
-from whoishistory.requester import Requester
 from whoishistory import ApiClient
 from whoishistory.models.historic import *
+from whoishistory.cache import MemoryCache
 from whoishistory.exceptions import EmptyResponseException, UnparsableResponseException
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import multiprocessing
+import threading
+import time
 import unittest
-import requests
-
-
-class MockResponse(requests.Response):
-    def __init__(self, body, status_code):
-        super().__init__()
-        self.status_code = status_code
-
-        self.raw = io.BytesIO(bytes(body, encoding="utf8"))
-
-
-class MockRequester(Requester):
-    def __init__(self, data):
-        super().__init__('test-agent')
-        self.data = data
 
-    def request(self, url, method: str = "GET", headers: dict = None, params: dict = None) -> requests.Response:
-        if self.data is Exception:
-            raise self.data
-
-        resp = MockResponse(self.data, 200)
-
-        return resp
+from tests.mocks import MockRequester, MockDomainRequester
 
 
 class ApiClientTest(unittest.TestCase):
@@ -51,6 +32,114 @@ class ApiClientTest(unittest.TestCase):
 
         self.assertEqual(valid, res)
 
+    def test_lazy_request(self):
+        payload = '{"records":[{"domainName":"domain.test"}], "recordsCount":1}'
+
+        client = ApiClient('test')
+        client.set_requester(MockRequester(payload))
+
+        res = client.purchase("domain.test", record_factory=LazyWhoisRecord)
+
+        self.assertIsInstance(res[0], LazyWhoisRecord)
+        self.assertEqual([WhoisRecord({"domainName": "domain.test"})], res)
+
+    def test_dedup_request(self):
+        payload = '{"records":[{"registrarName":"registrar"}, {"registrarName":"registrar"}], "recordsCount":2}'
+
+        client = ApiClient('test')
+        client.set_requester(MockRequester(payload))
+
+        res = client.purchase("domain.test", dedup=True)
+
+        self.assertEqual([WhoisRecord({"registrarName": "registrar"})] * 2, res)
+        self.assertIs(res[0].registrar_name, res[1].registrar_name)
+
+    def test_projected_request(self):
+        payload = '{"records":[{"domainName":"domain.test","rawText":"raw text",' \
+                  '"registrantContact":{"name":"registrant","rawText":"raw text"}}], "recordsCount":1}'
+
+        client = ApiClient('test')
+        client.set_requester(MockRequester(payload))
+
+        res = client.purchase("domain.test", exclude=['raw_text', 'registrant_contact.raw_text'], dedup=True)
+
+        self.assertEqual([WhoisRecord({"domainName": "domain.test", "registrantContact": {"name": "registrant"}})],
+                         res)
+
+        res = client.purchase("domain.test", fields=['domain_name'])
+
+        self.assertEqual([WhoisRecord({"domainName": "domain.test"})], res)
+
+    def test_cached_request(self):
+        payload = '{"records":[{"domainName":"domain.test"}], "recordsCount":1}'
+        fake_requester = MockRequester(payload)
+
+        client = ApiClient('test', cache=MemoryCache())
+        client.set_requester(fake_requester)
+
+        d = datetime.date(2020, 1, 1)
+        self.assertEqual(client.purchase("domain.test", sinceDate=d), client.purchase("Domain.test", sinceDate=d))
+        self.assertEqual(1, fake_requester.calls)
+
+        client.purchase("domain.test")
+        client.preview("domain.test")
+        self.assertEqual(3, fake_requester.calls)
+        self.assertEqual(1, client.cache.stats.hits)
+
+    def test_cached_raw_request(self):
+        payload = '{"records":[{"domainName":"domain.test","nameServers":["ns1.domain.test"]}], "recordsCount":1}'
+        fake_requester = MockRequester(payload)
+
+        client = ApiClient('test', cache=MemoryCache())
+        client.set_requester(fake_requester)
+
+        records = client.purchase_raw("domain.test")
+        records[0]['nameServers'].append('changed.test')
+        records.append({"domainName": "changed.test"})
+
+        self.assertEqual([{"domainName": "domain.test", "nameServers": ["ns1.domain.test"]}],
+                         client.purchase_raw("domain.test"))
+        self.assertEqual([WhoisRecord({"domainName": "domain.test", "nameServers": ["ns1.domain.test"]})],
+                         client.purchase("domain.test"))
+        self.assertEqual(1, fake_requester.calls)
+
+    def test_coalesced_request(self):
+        payload = '{"records":[{"domainName":"domain.test"}], "recordsCount":1}'
+        fake_requester = MockRequester(payload)
+        release = threading.Event()
+        request = fake_requester.request
+
+        def slow_request(*args, **kwargs):
+            release.wait()
+            return request(*args, **kwargs)
+
+        fake_requester.request = slow_request
+
+        client = ApiClient('test', coalesce=True)
+        client.set_requester(fake_requester)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(client.purchase, "domain.test") for _ in range(4)]
+            time.sleep(0.1)
+            release.set()
+            results = [f.result() for f in futures]
+
+        self.assertEqual([[WhoisRecord({"domainName": "domain.test"})]] * 4, results)
+        self.assertIsNot(results[0][0], results[1][0])
+        self.assertEqual(1, fake_requester.calls)
+
+    def test_raw_request(self):
+        payload = '{"records":[{"domainName":"domain.test"}], "recordsCount":1}'
+
+        client = ApiClient('test')
+        client.set_requester(MockRequester(payload))
+
+        self.assertEqual([{"domainName": "domain.test"}], client.purchase_raw("domain.test"))
+
+        client.set_requester(MockRequester('{"recordsCount":0}'))
+        with self.assertRaises(EmptyResponseException):
+            client.purchase_raw("domain.test")
+
     def test_error_request(self):
         payload = '{"code":999, "messages":"test error message"}'
         fake_requester = MockRequester(payload)
@@ -84,6 +173,110 @@ class ApiClientTest(unittest.TestCase):
         with self.assertRaises(UnparsableResponseException):
             client.purchase("domain.test")
 
+    def test_iter_purchase(self):
+        payload = '{"recordsCount":2, "records":[{"domainName":"a.test"}, {"domainName":"b.test"}]}'
+        fake_requester = MockRequester(payload)
+
+        client = ApiClient('test')
+        client.set_requester(fake_requester)
+
+        res = client.iter_purchase("domain.test", chunk_size=7)
+
+        self.assertEqual(WhoisRecord({"domainName": "a.test"}), next(res))
+        self.assertEqual([WhoisRecord({"domainName": "b.test"})], list(res))
+        self.assertEqual(len(payload), fake_requester.transfer_stats.decoded_bytes)
+        self.assertEqual(len(payload), fake_requester.transfer_stats.wire_bytes)
+
+    def test_iter_purchase_errors(self):
+        client = ApiClient('test')
+
+        client.set_requester(MockRequester('{"code":999, "messages":"test error message"}'))
+        with self.assertRaises(ErrorMessage):
+            list(client.iter_purchase("domain.test"))
+
+        client.set_requester(MockRequester(''))
+        with self.assertRaises(EmptyResponseException):
+            list(client.iter_purchase("domain.test"))
+
+        client.set_requester(MockRequester('not a json'))
+        with self.assertRaises(UnparsableResponseException):
+            list(client.iter_purchase("domain.test"))
+
+    def test_purchase_many(self):
+        data = dict()
+        for i in range(20):
+            data['domain%d.test' % i] = '{"records":[{"domainName":"domain%d.test"}], "recordsCount":1}' % i
+        data['error.test'] = '{"code":999, "messages":"test error message"}'
+        data['empty.test'] = ''
+
+        client = ApiClient('test')
+        client.set_requester(MockDomainRequester(data))
+
+        domains = list(data.keys())
+        res = list(client.purchase_many(domains, max_workers=4))
+
+        self.assertEqual(domains, [r.domain_name for r in res])
+        for r in res[:20]:
+            self.assertTrue(r.ok)
+            self.assertEqual([WhoisRecord({"domainName": r.domain_name})], r.result)
+        self.assertIsInstance(res[20].error, ErrorMessage)
+        self.assertIsInstance(res[21].error, EmptyResponseException)
+
+        res = list(client.purchase_many(domains, max_workers=4, ordered=False))
+        self.assertEqual(sorted(domains), sorted(r.domain_name for r in res))
+
+    def test_purchase_many_process_pool(self):
+        data = dict()
+        for i in range(4):
+            data['domain%d.test' % i] = \
+                '{"records":[{"domainName":"domain%d.test","registrantContact":{"name":"registrant"}},' \
+                '{"domainName":"domain%d.test","registrantContact":{"name":"registrant"}}], "recordsCount":2}' % (i, i)
+        data['error.test'] = '{"code":999, "messages":"test error message"}'
+        data['invalid.test'] = 'not a json'
+
+        client = ApiClient('test')
+        client.set_requester(MockDomainRequester(data))
+
+        domains = list(data.keys())
+
+        with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context('spawn')) as pool:
+            res = list(client.purchase_many(domains, max_workers=2, process_pool=pool, dedup=True))
+
+            self.assertEqual(domains, [r.domain_name for r in res])
+            for r in res[:4]:
+                self.assertTrue(r.ok)
+                self.assertEqual([WhoisRecord({"domainName": r.domain_name, "registrantContact": {"name": "registrant"}})] * 2,
+                                 r.result)
+                # equal values are shared by the records built in a worker
+                self.assertIs(r.result[0].registrant_contact, r.result[1].registrant_contact)
+            self.assertIsInstance(res[4].error, ErrorMessage)
+            self.assertEqual(999, res[4].error.code)
+            self.assertIsInstance(res[5].error, UnparsableResponseException)
+
+            res = list(client.purchase_many(domains[:1], process_pool=pool))
+            self.assertEqual(res[0].result[0], res[0].result[1])
+            self.assertIsNot(res[0].result[0].registrant_contact, res[0].result[1].registrant_contact)
+
+            res = list(client.purchase_many(domains[:1], process_pool=pool, fields=['domain_name']))
+            self.assertEqual('domain0.test', res[0].result[0].domain_name)
+            self.assertIsNone(res[0].result[0].registrant_contact)
+
+        res = list(client.purchase_many(domains[:2], max_workers=2, process_pool=1, ordered=False))
+        self.assertEqual(sorted(domains[:2]), sorted(r.domain_name for r in res))
+
+    def test_preview_many(self):
+        data = {
+            'a.test': '{"recordsCount":1}',
+            'b.test': '{"recordsCount":2}',
+        }
+
+        client = ApiClient('test')
+        client.set_requester(MockDomainRequester(data))
+
+        res = client.preview_many(iter(['a.test', 'b.test']), max_workers=2)
+
+        self.assertEqual([1, 2], [r.result for r in res])
+
     def tearDown(self):
         pass
 
@@ -0,0 +1,155 @@
+from whoishistory.async_requester import AsyncRequester, AsyncResponse
+from whoishistory import AsyncApiClient
+from whoishistory.models.historic import *
+from whoishistory.exceptions import EmptyResponseException, UnparsableResponseException
+from whoishistory.testing import StubServer
+import asyncio
+import json
+import time
+import unittest
+
+
+class MockAsyncRequester(AsyncRequester):
+    def __init__(self, data):
+        super().__init__('test-agent')
+        self.data = data
+        self.params = []
+
+    async def request(self, url, method: str = "GET", headers: dict = None, params: dict = None):
+        self.params.append(params)
+
+        return AsyncResponse(200, {}, self.data.encode('utf-8'))
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+class AsyncApiClientTest(unittest.TestCase):
+
+    def setUp(self):
+        asyncio.set_event_loop(asyncio.new_event_loop())
+
+    def test_request(self):
+        payload = '{"records":[{"domainName":"domain.test"}], "recordsCount":1}'
+        fake_requester = MockAsyncRequester(payload)
+
+        client = AsyncApiClient('test')
+        client.set_requester(fake_requester)
+
+        res = run(client.purchase("domain.test"))
+
+        valid = [WhoisRecord({"domainName": "domain.test"})]
+
+        self.assertEqual(valid, res)
+
+    def test_preview(self):
+        fake_requester = MockAsyncRequester('{"recordsCount":5}')
+
+        client = AsyncApiClient('test')
+        client.set_requester(fake_requester)
+
+        self.assertEqual(5, run(client.preview("domain.test", sinceDate=datetime.date(2020, 1, 2))))
+        self.assertEqual('preview', fake_requester.params[0]['mode'])
+        self.assertEqual('2020-01-02', fake_requester.params[0]['sinceDate'])
+
+    def test_concurrent_requests(self):
+        payload = '{"records":[{"domainName":"domain.test"}], "recordsCount":1}'
+        fake_requester = MockAsyncRequester(payload)
+
+        client = AsyncApiClient('test')
+        client.set_requester(fake_requester)
+
+        async def gather():
+            return await asyncio.gather(*[client.purchase('domain%d.test' % i) for i in range(10)])
+
+        res = run(gather())
+
+        self.assertEqual(10, len(res))
+        self.assertEqual(10, len(fake_requester.params))
+
+    def test_error_request(self):
+        fake_requester = MockAsyncRequester('{"code":999, "messages":"test error message"}')
+
+        client = AsyncApiClient('test')
+        client.set_requester(fake_requester)
+
+        with self.assertRaises(ErrorMessage):
+            run(client.purchase("domain.test"))
+
+    def test_get_empty_response(self):
+        fake_requester = MockAsyncRequester('')
+
+        client = AsyncApiClient('test')
+        client.set_requester(fake_requester)
+
+        with self.assertRaises(EmptyResponseException):
+            run(client.purchase("domain.test"))
+
+    def test_get_unparsable_response(self):
+        fake_requester = MockAsyncRequester('not a json')
+
+        client = AsyncApiClient('test')
+        client.set_requester(fake_requester)
+
+        with self.assertRaises(UnparsableResponseException):
+            run(client.purchase("domain.test"))
+
+    def test_stub_server(self):
+        history = [{'domainName': 'a.test', 'registrarName': 'registrar'}]
+
+        async def calls(url):
+            async with AsyncApiClient('test', url=url) as client:
+                return await client.purchase('a.test'), await client.preview('a.test'), await client.preview('b.test')
+
+        with StubServer({'a.test': history}, records=3) as server:
+            purchased, count, synthetic = run(calls(server.url))
+
+        self.assertEqual([WhoisRecord(history[0])], purchased)
+        self.assertEqual(1, count)
+        self.assertEqual(3, synthetic)
+
+    def test_stub_server_error(self):
+        async def preview(url):
+            async with AsyncApiClient('wrong', url=url) as client:
+                return await client.preview('a.test')
+
+        with StubServer(api_keys=['key'], records=1) as server:
+            with self.assertRaises(ErrorMessage) as cm:
+                run(preview(server.url))
+
+        self.assertEqual(403, cm.exception.code)
+
+        response = run(self.request_stub(AsyncRequester('test-agent'), {'domainName': 'a.test'}))
+        self.assertEqual(200, response.status)
+        self.assertEqual({'recordsCount': 1}, json.loads(response.body))
+        self.assertEqual('application/json', response.headers['content-type'])
+
+    async def request_stub(self, requester, params):
+        with StubServer(records=1) as server:
+            async with requester:
+                return await requester.request(server.url, params=params)
+
+    def test_max_concurrency(self):
+        async def previews(url, max_concurrency):
+            async with AsyncApiClient('test', url=url, max_concurrency=max_concurrency) as client:
+                start = time.monotonic()
+                counts = await asyncio.gather(*[client.preview('domain%d.test' % i) for i in range(6)])
+                return counts, time.monotonic() - start
+
+        with StubServer(records=2, latency=0.1) as server:
+            counts, elapsed = run(previews(server.url, 2))
+            self.assertEqual([2] * 6, counts)
+            # three rounds of two requests
+            self.assertGreaterEqual(elapsed, 0.3)
+
+            counts, elapsed = run(previews(server.url, 6))
+            self.assertEqual([2] * 6, counts)
+            self.assertLess(elapsed, 0.3)
+
+    def tearDown(self):
+        asyncio.get_event_loop().close()
+
+
+if __name__ == '__main__':
+    unittest.main()
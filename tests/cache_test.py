@@ -0,0 +1,88 @@
+from whoishistory.cache import cache_key, MemoryCache, SqliteCache, TieredCache
+import os
+import tempfile
+import time
+import unittest
+
+
+class CacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'cache.sqlite')
+
+    def test_cache_key(self):
+        a = cache_key({'domainName': 'Domain.Test', 'apiKey': 'a', 'mode': 'purchase', 'sinceDate': '2020-01-01'})
+        b = cache_key({'sinceDate': '2020-01-01', 'mode': 'purchase', 'apiKey': 'b', 'domainName': 'domain.test'})
+        c = cache_key({'domainName': 'domain.test', 'apiKey': 'a', 'mode': 'preview', 'sinceDate': '2020-01-01'})
+
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_memory_cache(self):
+        cache = MemoryCache(max_entries=2)
+
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', {'v': 1})
+        cache.set('b', {'v': 2})
+        self.assertEqual({'v': 1}, cache.get('a'))
+        cache.set('c', {'v': 3})
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual({'v': 1}, cache.get('a'))
+        self.assertEqual(2, len(cache))
+        self.assertEqual(2, cache.stats.hits)
+        self.assertEqual(2, cache.stats.misses)
+        self.assertEqual(1, cache.stats.evictions)
+
+    def test_memory_cache_ttl(self):
+        cache = MemoryCache(ttl=-1)
+        cache.set('a', {'v': 1})
+        self.assertIsNone(cache.get('a'))
+
+    def test_sqlite_cache(self):
+        cache = SqliteCache(self.path, max_entries=2)
+
+        cache.set('a', {'v': 1})
+        time.sleep(0.01)
+        cache.set('b', {'v': 2})
+        time.sleep(0.01)
+        self.assertEqual({'v': 1}, cache.get('a'))
+        cache.set('c', {'v': 3})
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1, cache.stats.evictions)
+        cache.close()
+
+        cache = SqliteCache(self.path)
+        self.assertEqual({'v': 3}, cache.get('c'))
+        cache.close()
+
+    def test_sqlite_cache_ttl(self):
+        cache = SqliteCache(self.path, ttl=-1)
+        cache.set('a', {'v': 1})
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(0, len(cache))
+        cache.close()
+
+    def test_tiered_cache(self):
+        memory = MemoryCache()
+        disk = SqliteCache(self.path)
+        disk.set('a', {'v': 1})
+
+        cache = TieredCache(memory, disk)
+
+        self.assertEqual({'v': 1}, cache.get('a'))
+        self.assertEqual({'v': 1}, memory.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(1, cache.stats.hits)
+        self.assertEqual(1, cache.stats.misses)
+        disk.close()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+from whoishistory.changes import Change, detect_changes, detect_changes_by_domain
+from whoishistory.models.historic import *
+import unittest
+
+
+def record(day, domain='domain.test', registrar='registrar', name_servers=None, registrant='registrant'):
+    return WhoisRecord({
+        'domainName': domain,
+        'audit': {'updatedDate': '2020-04-%02dT00:00:00+00:00' % day},
+        'nameServers': name_servers or ['ns1.domain.test', 'ns2.domain.test'],
+        'registrarName': registrar,
+        'status': ['ok'],
+        'registrantContact': {'name': registrant},
+    })
+
+
+def utc(day):
+    return datetime.datetime(2020, 4, day, tzinfo=datetime.timezone.utc)
+
+
+class ChangesTest(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_detect_changes(self):
+        history = [
+            record(3, registrar='new registrar'),
+            record(1),
+            record(2, name_servers=['NS2.domain.test', 'ns1.domain.test']),
+            record(4, registrar='new registrar', registrant='new registrant'),
+        ]
+
+        changes = list(detect_changes(history))
+
+        self.assertEqual([
+            Change('domain.test', 'registrar_name', 'registrar', 'new registrar', utc(3)),
+            Change('domain.test', 'registrant_contact',
+                   Contact({'name': 'registrant'}), Contact({'name': 'new registrant'}), utc(4)),
+        ], changes)
+
+    def test_fields(self):
+        history = [record(1), record(2, name_servers=['ns3.domain.test'])]
+
+        self.assertEqual([], list(detect_changes(history, fields=['registrar_name'])))
+        self.assertEqual(['name_servers'], [c.field for c in detect_changes(history)])
+
+    def test_missing_audit(self):
+        history = [record(1, registrar='b'), WhoisRecord({'domainName': 'domain.test', 'registrarName': 'a'})]
+
+        changes = list(detect_changes(history, fields=['registrar_name']))
+
+        self.assertEqual([Change('domain.test', 'registrar_name', 'a', 'b', utc(1))], changes)
+
+    def test_by_domain(self):
+        records = [
+            record(1, domain='a.test'),
+            record(1, domain='b.test'),
+            record(2, domain='A.test', registrar='other'),
+            record(2, domain='b.test'),
+        ]
+
+        changes = list(detect_changes_by_domain(records))
+
+        self.assertEqual([Change('A.test', 'registrar_name', 'registrar', 'other', utc(2))], changes)
+
+    def tearDown(self):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
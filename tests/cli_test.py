@@ -0,0 +1,151 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from mock import patch
+from whoishistory.exceptions import ServerErrorException
+from whoishistory import ApiClient
+from whoishistory.cli import main, read_domains, read_checkpoint, run
+import threading
+import time
+import unittest
+
+from tests.mocks import MockDomainRequester
+
+
+def mock_client(data: dict) -> ApiClient:
+    client = ApiClient('test')
+    client.set_requester(MockDomainRequester(data))
+    return client
+
+
+class CliTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def test_read_domains(self):
+        lines = ['a.test\n', '\n', '# comment\n', '{"domainName": "b.test", "other": 1}\n', '  c.test  \n', '{}\n']
+
+        self.assertEqual(['a.test', 'b.test', 'c.test'], list(read_domains(lines)))
+        self.assertEqual(set(), read_checkpoint(os.path.join(self.dir, 'missing')))
+
+    def test_read_invalid_domains(self):
+        lines = ['a.test\n', '{"domainName": "b.test"\n', '{"domainName": 1}\n', '["c.test"]\n', 'd.test\n']
+        errors = io.StringIO()
+
+        self.assertEqual(['a.test', '["c.test"]', 'd.test'], list(read_domains(lines, errors)))
+        self.assertEqual(['line 2 skipped, invalid JSON', 'line 3 skipped, domainName is not a string'],
+                         [line.split(':')[0] for line in errors.getvalue().splitlines()])
+
+    def test_interrupted_run(self):
+        data = {'d%d.test' % i: '{"recordsCount":1,"records":[]}' for i in range(8)}
+        client = mock_client(data)
+        started = threading.Event()
+        request = client.requester.request
+
+        def slow_request(*args, **kwargs):
+            started.set()
+            time.sleep(0.2)
+            return request(*args, **kwargs)
+
+        client.requester.request = slow_request
+
+        def domains():
+            yield from sorted(data)[:3]
+            started.wait()
+            raise KeyboardInterrupt()
+
+        output = io.StringIO()
+        checkpoint = io.StringIO()
+
+        with self.assertRaises(KeyboardInterrupt):
+            run(client, 'purchase', domains(), output, checkpoint, max_workers=2)
+
+        # the running purchases are written and checkpointed, the queued ones are not made
+        self.assertEqual(['d0.test', 'd1.test'], sorted(client.requester.domains))
+        self.assertEqual('d0.test\nd1.test\n', ''.join(sorted(checkpoint.getvalue().splitlines(True))))
+        self.assertEqual(2, len(output.getvalue().splitlines()))
+
+    def test_run(self):
+        client = mock_client({
+            'a.test': '{"recordsCount":2,"records":[{"domainName":"a.test"},{"domainName":"a.test"}]}',
+            'b.test': '{"code":400,"messages":"invalid domain"}',
+        })
+        output = io.StringIO()
+        checkpoint = io.StringIO()
+
+        counts = run(client, 'purchase', ['a.test', 'b.test', 'A.test', 'c.test'], output, checkpoint,
+                     done={'c.test'}, max_workers=2)
+
+        self.assertEqual({'ok': 1, 'failed': 1, 'skipped': 2}, counts)
+        self.assertEqual('a.test\n', checkpoint.getvalue())
+
+        lines = {r['domainName']: r for r in map(json.loads, output.getvalue().splitlines())}
+        self.assertEqual([{'domainName': 'a.test'}] * 2, lines['a.test']['records'])
+        self.assertEqual('ErrorMessage', lines['b.test']['errorType'])
+        self.assertEqual('[400] invalid domain', lines['b.test']['error'])
+
+        output = io.StringIO()
+        run(client, 'preview', ['a.test'], output)
+        self.assertEqual({'domainName': 'a.test', 'recordsCount': 2}, json.loads(output.getvalue()))
+
+    def test_resume(self):
+        data = {
+            'a.test': '{"recordsCount":1,"records":[{"domainName":"a.test"}]}',
+            'b.test': ServerErrorException,
+        }
+        client = mock_client(data)
+
+        input_path = os.path.join(self.dir, 'domains.txt')
+        output_path = os.path.join(self.dir, 'out.jsonl')
+        checkpoint_path = os.path.join(self.dir, 'checkpoint')
+
+        with open(input_path, 'w') as f:
+            f.write('a.test\nb.test\n')
+
+        args = ['purchase', input_path, '-o', output_path, '-c', checkpoint_path, '-k', 'test', '--retries', '0']
+
+        with patch('whoishistory.cli.ApiClient', side_effect=lambda *a, **kw: client):
+            with patch('sys.stderr', new_callable=io.StringIO) as stderr:
+                self.assertEqual(1, main(args))
+            self.assertEqual('1 ok, 1 failed, 0 skipped', stderr.getvalue().splitlines()[-1])
+            self.assertEqual({'a.test'}, read_checkpoint(checkpoint_path))
+
+            data['b.test'] = '{"recordsCount":0,"records":[]}'
+            with patch('sys.stderr', new_callable=io.StringIO) as stderr:
+                self.assertEqual(0, main(args))
+            self.assertEqual('1 ok, 0 failed, 1 skipped', stderr.getvalue().splitlines()[-1])
+
+        self.assertEqual(['a.test', 'b.test', 'b.test'], client.requester.domains)
+        self.assertEqual({'a.test', 'b.test'}, read_checkpoint(checkpoint_path))
+
+        with open(output_path) as f:
+            lines = [json.loads(line) for line in f]
+
+        self.assertEqual(3, len(lines))
+        self.assertEqual({'domainName': 'b.test', 'records': []}, lines[-1])
+
+    def test_date_options(self):
+        client = mock_client({'a.test': '{"recordsCount":1}'})
+
+        with patch('whoishistory.cli.ApiClient', side_effect=lambda *a, **kw: client), \
+                patch('sys.stdin', io.StringIO('a.test\n')), patch('sys.stdout', io.StringIO()) as stdout, \
+                patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            self.assertEqual(0, main(['preview', '-k', 'test', '--since-date', '2020-01-02']))
+
+        self.assertEqual({'domainName': 'a.test', 'recordsCount': 1}, json.loads(stdout.getvalue()))
+        self.assertEqual('1 ok, 0 failed, 0 skipped\n', stderr.getvalue())
+
+        with patch('sys.stderr', io.StringIO()):
+            with self.assertRaises(SystemExit):
+                main(['preview', '-k', 'test', '--since-date', '2020/01/02'])
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
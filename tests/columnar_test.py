@@ -0,0 +1,92 @@
+from whoishistory.models.columnar import COLUMNS, to_numpy, to_arrow, to_pandas
+import datetime
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+records = [
+    {
+        'domainName': 'domain.test',
+        'createdDateISO8601': '2020-04-25T17:25:00-07:00',
+        'audit': {'createdDate': '2020-04-25T17:25:49+00:00'},
+        'nameServers': ['ns1.domain.test', 'ns2.domain.test'],
+        'registrarName': 'registrar',
+        'status': ['ok'],
+        'registrantContact': {'name': 'registrant', 'postalCode': '12345'},
+    },
+    {
+        'domainName': 'domain.test',
+        'createdDateISO8601': None,
+    },
+]
+
+
+class ColumnarTest(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy(self):
+        columns = to_numpy(records)
+
+        self.assertEqual(list(COLUMNS), list(columns))
+        self.assertEqual(numpy.datetime64('2020-04-26T00:25:00'), columns['created_date_iso8601'][0])
+        self.assertTrue(numpy.isnat(columns['created_date_iso8601'][1]))
+        self.assertEqual(numpy.datetime64('2020-04-25T17:25:49'), columns['audit_created_date'][0])
+        self.assertTrue(numpy.isnat(columns['audit_updated_date'][0]))
+        self.assertEqual(['ns1.domain.test', 'ns2.domain.test'], columns['name_servers'][0])
+        self.assertEqual([], columns['name_servers'][1])
+        self.assertEqual('registrar', columns['registrar_name'][0])
+        self.assertEqual('', columns['registrar_name'][1])
+        self.assertEqual('12345', columns['registrant_contact_postal_code'][0])
+        self.assertEqual('', columns['registrant_contact_postal_code'][1])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_columns(self):
+        columns = to_numpy(records, columns=['registrar_name', 'audit_created_date'])
+
+        self.assertEqual(['audit_created_date', 'registrar_name'], list(columns))
+
+        with self.assertRaises(ValueError):
+            to_numpy(records, columns=['unknown'])
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_arrow(self):
+        table = to_arrow(records)
+
+        self.assertEqual(list(COLUMNS), table.column_names)
+        self.assertEqual(pyarrow.timestamp('s', tz='UTC'), table.schema.field('created_date_iso8601').type)
+        self.assertEqual(pyarrow.list_(pyarrow.string()), table.schema.field('status').type)
+
+        created = table.column('created_date_iso8601').to_pylist()
+        self.assertEqual(datetime.datetime(2020, 4, 26, 0, 25, tzinfo=datetime.timezone.utc), created[0])
+        self.assertIsNone(created[1])
+
+    @unittest.skipIf(pandas is None, 'pandas is not installed')
+    def test_pandas(self):
+        frame = to_pandas(records)
+
+        self.assertEqual(2, len(frame))
+        self.assertEqual('M', frame['created_date_iso8601'].dtype.kind)
+        self.assertEqual(['ok'], list(frame['status'][0]))
+
+    def tearDown(self):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
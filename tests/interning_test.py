@@ -0,0 +1,82 @@
+from whoishistory.models.historic import *
+from whoishistory.models.interning import Interner
+import pickle
+import unittest
+
+
+def payload(i):
+    return {
+        'domainName': 'domain.test',
+        'updatedDateISO8601': '2020-04-25T17:25:0%d+00:00' % (i % 2),
+        'audit': {"createdDate": "2020-04-25T17:25:49+00:00"},
+        'nameServers': ['ns1.domain.test', 'ns2.domain.test'],
+        'registrarName': 'registrar ' + 'name',
+        'status': ['clientTransferProhibited'],
+        'rawText': 'raw text %d' % i,
+        'registrantContact': {'name': 'registrant', 'rawText': 'contact ' + 'raw text'},
+        'technicalContact': {'name': 'technical %d' % i},
+    }
+
+
+class InterningTest(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_interning(self):
+        interner = Interner()
+
+        first = interner(payload(0))
+        second = interner(payload(1))
+        third = interner(payload(2))
+
+        self.assertEqual(WhoisRecord(payload(0)), first)
+        self.assertEqual(WhoisRecord(payload(1)), second)
+
+        self.assertIs(first.registrar_name, second.registrar_name)
+        self.assertIs(first.name_servers[0], second.name_servers[0])
+        self.assertIs(first.registrant_contact, second.registrant_contact)
+        self.assertIs(first.audit, second.audit)
+        self.assertIs(first.updated_date_iso8601, third.updated_date_iso8601)
+        self.assertIsNot(first.technical_contact, second.technical_contact)
+        self.assertIsNone(first.zone_contact)
+
+    def test_pickle(self):
+        interner = Interner()
+        records = [interner(payload(i)) for i in range(3)]
+
+        copies = pickle.loads(pickle.dumps(records))
+
+        self.assertEqual(records, copies)
+        self.assertIs(copies[0].registrant_contact, copies[1].registrant_contact)
+        self.assertIs(copies[0].audit, copies[2].audit)
+        self.assertIs(copies[0].registrar_name, copies[1].registrar_name)
+
+    def test_dates_with_offsets(self):
+        interner = Interner()
+
+        utc = interner({'createdDateISO8601': '2020-04-25T17:00:00+00:00'})
+        pdt = interner({'createdDateISO8601': '2020-04-25T10:00:00-07:00'})
+
+        self.assertEqual(utc.created_date_iso8601, pdt.created_date_iso8601)
+        self.assertEqual(10, pdt.created_date_iso8601.hour)
+
+    def test_compact_records(self):
+        interner = Interner(CompactWhoisRecord)
+
+        first = interner(payload(0))
+        second = interner(payload(1))
+
+        self.assertIsInstance(first, CompactWhoisRecord)
+        self.assertIs(first.registrant_contact, second.registrant_contact)
+        self.assertEqual(WhoisRecord(payload(0)), first)
+
+    def test_empty_record(self):
+        self.assertEqual(WhoisRecord(), Interner()(dict()))
+
+    def tearDown(self):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+from whoishistory import ApiClient
+from whoishistory.json_backend import BACKENDS, DEFAULT_BACKEND, get_loads
+from whoishistory.models.historic import *
+from whoishistory.exceptions import UnparsableResponseException
+import json
+import unittest
+
+from tests.mocks import MockRequester
+
+
+class JsonBackendTest(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_get_loads(self):
+        self.assertIs(json.loads, get_loads('json'))
+        self.assertIs(BACKENDS[DEFAULT_BACKEND], get_loads())
+        self.assertEqual('json', list(BACKENDS)[-1])
+
+        def loads(data):
+            return json.loads(data)
+
+        self.assertIs(loads, get_loads(loads))
+
+        with self.assertRaises(ValueError):
+            get_loads('unknown')
+
+    def test_backends(self):
+        payload = '{"records":[{"domainName":"domain.test","registrarName":"r\\u00e9gistrar"}], "recordsCount":1}'
+
+        for name in BACKENDS:
+            client = ApiClient('test', json_backend=name)
+            client.set_requester(MockRequester(payload))
+
+            res = client.purchase("domain.test")
+
+            self.assertEqual([WhoisRecord({"domainName": "domain.test", "registrarName": "régistrar"})], res)
+            self.assertEqual(1, client.preview("domain.test"))
+
+            client.set_requester(MockRequester('{"records":'))
+            with self.assertRaises(UnparsableResponseException):
+                client.purchase("domain.test")
+
+            client.set_requester(MockRequester(payload))
+            self.assertEqual(res, list(client.iter_purchase("domain.test", chunk_size=7)))
+
+    def test_callable_backend(self):
+        bodies = []
+
+        def loads(data):
+            bodies.append(data)
+            return json.loads(data)
+
+        client = ApiClient('test', json_backend=loads)
+        client.set_requester(MockRequester('{"recordsCount":1}'))
+
+        self.assertEqual(1, client.preview("domain.test"))
+        self.assertEqual([b'{"recordsCount":1}'], bodies)
+
+    def tearDown(self):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+from concurrent.futures import ThreadPoolExecutor
+from mock import patch
+from whoishistory import ApiClient, Requester
+from whoishistory.exceptions import ServerErrorException, UnparsableResponseException
+from whoishistory.metrics import Metrics, PrometheusMetrics
+from whoishistory.rate_limiter import RetryPolicy
+from whoishistory.testing import StubServer
+import unittest
+import requests
+
+from tests.mocks import MockResponse
+
+
+def mocked_sequence(*responses):
+    responses = list(responses)
+
+    def request(*args, **kwargs):
+        status_code, body = responses.pop(0)
+        return MockResponse(body, status_code)
+
+    return request
+
+
+class MetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_exposition(self):
+        metrics = PrometheusMetrics(buckets=(0.1, 1.0))
+
+        metrics.timing('parse', 0.05)
+        metrics.timing('parse', 0.5)
+        metrics.timing('parse', 5.0)
+        metrics.records(3)
+        metrics.error('request', ValueError('x'))
+
+        self.assertEqual(3, metrics.counter('records_total'))
+        self.assertEqual(1, metrics.counter('errors_total', phase='request', error='ValueError'))
+        self.assertEqual(
+            '# TYPE whoishistory_errors_total counter\n'
+            'whoishistory_errors_total{error="ValueError",phase="request"} 1\n'
+            '# TYPE whoishistory_records_total counter\n'
+            'whoishistory_records_total 3\n'
+            '# TYPE whoishistory_phase_seconds histogram\n'
+            'whoishistory_phase_seconds_bucket{phase="parse",le="0.1"} 1\n'
+            'whoishistory_phase_seconds_bucket{phase="parse",le="1.0"} 2\n'
+            'whoishistory_phase_seconds_bucket{phase="parse",le="+Inf"} 3\n'
+            'whoishistory_phase_seconds_sum{phase="parse"} 5.55\n'
+            'whoishistory_phase_seconds_count{phase="parse"} 3\n',
+            metrics.expose()
+        )
+
+    def test_api_client(self):
+        payload = '{"records":[{"domainName":"a.test"},{"domainName":"a.test"}], "recordsCount":2}'
+        metrics = PrometheusMetrics()
+        client = ApiClient('test', metrics=metrics)
+
+        with patch('whoishistory.requester.requests.Session.request',
+                   side_effect=mocked_sequence((200, payload), (200, payload), (200, '{'))):
+            self.assertEqual(2, len(client.purchase('a.test')))
+            self.assertEqual(2, len(list(client.iter_purchase('a.test'))))
+
+            with self.assertRaises(UnparsableResponseException):
+                client.preview('a.test')
+
+        self.assertEqual(4, metrics.counter('records_total'))
+        self.assertEqual(3, metrics.counter('responses_total'))
+        self.assertEqual(2 * len(payload) + 1, metrics.counter('decoded_bytes_total'))
+        self.assertEqual(1, metrics.counter('errors_total', phase='parse', error='UnparsableResponseException'))
+
+        exposed = metrics.expose()
+        for phase in ('ttfb', 'download', 'parse', 'build'):
+            self.assertIn('whoishistory_phase_seconds_count{phase="%s"}' % phase, exposed)
+
+    def test_batch_calls(self):
+        with StubServer(records=30) as server:
+            metrics = PrometheusMetrics()
+            client = ApiClient('test', url=server.url, metrics=metrics)
+
+            self.assertEqual(30, len(client.purchase_raw('a.test')))
+            self.assertEqual(0, metrics.counter('records_total'))
+            self.assertIn('whoishistory_phase_seconds_count{phase="parse"} 1\n', metrics.expose())
+
+            self.assertEqual(30, len(client.purchase_sharded('a.test', max_records=10)))
+            self.assertEqual(30, metrics.counter('records_total'))
+            self.assertIn('whoishistory_phase_seconds_count{phase="build"} 1\n', metrics.expose())
+
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                res = list(client.purchase_many(['a.test', 'b.test'], process_pool=pool))
+
+            self.assertTrue(all(r.ok for r in res))
+            self.assertEqual(90, metrics.counter('records_total'))
+            self.assertIn('whoishistory_phase_seconds_count{phase="build"} 3\n', metrics.expose())
+
+    def test_requester(self):
+        metrics = PrometheusMetrics()
+        requester = Requester('test-agent', retry_policy=RetryPolicy(max_retries=1, backoff=0), metrics=metrics)
+
+        with patch('whoishistory.requester.requests.Session.request',
+                   side_effect=mocked_sequence((503, ''), (429, ''))):
+            with self.assertRaises(ServerErrorException):
+                requester.request('http://test.test/')
+
+        with patch('whoishistory.requester.requests.Session.request', side_effect=requests.ConnectionError()):
+            with self.assertRaises(requests.ConnectionError):
+                requester.request('http://test.test/')
+
+        self.assertEqual(1, metrics.counter('retries_total', status=503))
+        self.assertEqual(1, metrics.counter('errors_total', phase='request', error='ServerErrorException'))
+        self.assertEqual(1, metrics.counter('errors_total', phase='request', error='ConnectionError'))
+
+    def test_noop(self):
+        client = ApiClient('test', metrics=Metrics())
+
+        with patch('whoishistory.requester.requests.Session.request',
+                   side_effect=mocked_sequence((200, '{"records":[], "recordsCount":0}'))):
+            self.assertEqual([], client.purchase('a.test'))
+
+    def tearDown(self):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
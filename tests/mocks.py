@@ -0,0 +1,48 @@
+import io
+
+from whoishistory.exceptions import ServerErrorException
+from whoishistory.requester import Requester
+import requests
+
+
+class MockResponse(requests.Response):
+    def __init__(self, body, status_code):
+        super().__init__()
+        self.status_code = status_code
+
+        self.raw = io.BytesIO(bytes(body, encoding="utf8"))
+
+
+class MockRequester(Requester):
+    def __init__(self, data):
+        super().__init__('test-agent')
+        self.data = data
+        self.calls = 0
+
+    def request(self, url, method: str = "GET", headers: dict = None, params: dict = None,
+                stream: bool = False) -> requests.Response:
+        if self.data is Exception:
+            raise self.data
+
+        self.calls += 1
+        resp = MockResponse(self.data, 200)
+
+        return resp
+
+
+class MockDomainRequester(Requester):
+    def __init__(self, data: dict):
+        super().__init__('test-agent')
+        self.data = data
+        self.domains = []
+
+    def request(self, url, method: str = "GET", headers: dict = None, params: dict = None,
+                stream: bool = False) -> requests.Response:
+        domain_name = params['domainName']
+        self.domains.append(domain_name)
+
+        body = self.data[domain_name]
+        if body is ServerErrorException:
+            raise ServerErrorException(503, 'unavailable')
+
+        return MockResponse(body, 200)
@@ -1,4 +1,6 @@
 from whoishistory.models.historic import *
+from whoishistory.models.historic import _parse_datetime, _strptime_datetime
+import pickle
 import unittest
 
 
@@ -116,6 +118,193 @@ class ApiClientTest(unittest.TestCase):
         else:
             self.assertEqual(parsed, valid)
 
+    def test_whoisRecord_to_dict(self):
+        payload = {
+            'domainName': 'domainName',
+            'createdDateISO8601': '2020-04-25T17:25:00-07:00',
+            'audit': {"createdDate": "2020-04-25T17:25:49+00:00"},
+            'nameServers': ['nameServers'],
+            'status': ['status'],
+            'registrantContact': {'name': 'registrantContact', 'telephoneExt': '12'},
+        }
+
+        for record in (WhoisRecord(payload), CompactWhoisRecord(payload), LazyWhoisRecord(payload), WhoisRecord()):
+            values = record.to_dict()
+            self.assertEqual(record, WhoisRecord(values))
+            self.assertEqual(record, CompactWhoisRecord(values))
+
+        values = WhoisRecord(payload).to_dict()
+        self.assertEqual('2020-04-25T17:25:00-07:00', values['createdDateISO8601'])
+        self.assertEqual('12', values['registrantContact']['telephoneExt'])
+        self.assertNotIn('zoneContact', values)
+
+    def test_lazy_whoisRecord(self):
+        payload = {
+            'domainName': 'domainName',
+            'createdDateISO8601': '2020-04-25T17:25:00+00:00',
+            'nameServers': ['nameServers'],
+            'registrarName': 'registrarName',
+            'registrantContact': {'name': 'registrantContact'},
+        }
+
+        parsed = LazyWhoisRecord(payload)
+
+        self.assertNotIn('registrar_name', parsed.__dict__)
+        self.assertEqual('registrarName', parsed.registrar_name)
+        self.assertIn('registrar_name', parsed.__dict__)
+        self.assertIs(parsed.registrant_contact, parsed.registrant_contact)
+        self.assertEqual('', parsed.audit)
+        self.assertIsNone(parsed.zone_contact)
+
+        valid = WhoisRecord(payload)
+
+        self.assertEqual(valid, parsed)
+        self.assertEqual(parsed, valid)
+        payload.pop('registrantContact')
+        self.assertEqual(str(WhoisRecord(payload)), str(LazyWhoisRecord(payload)))
+        self.assertEqual(WhoisRecord(), LazyWhoisRecord())
+
+        with self.assertRaises(AttributeError):
+            parsed.unknown_field
+
+    def test_compact_whoisRecord(self):
+        payload = {
+            'domainName': 'domainName',
+            'createdDateISO8601': '2020-04-25T17:25:00+00:00',
+            'audit': {"createdDate": "2020-04-25T17:25:49+00:00"},
+            'nameServers': ['nameServers'],
+            'registrarName': 'registrarName',
+            'registrantContact': {'name': 'registrantContact'},
+        }
+
+        parsed = CompactWhoisRecord(payload)
+
+        self.assertFalse(hasattr(parsed, '__dict__'))
+        self.assertIsInstance(parsed.audit, CompactAudit)
+        self.assertIsInstance(parsed.registrant_contact, CompactContact)
+        self.assertEqual('registrarName', parsed.registrar_name)
+
+        self.assertEqual(WhoisRecord(payload), parsed)
+        self.assertEqual(parsed, WhoisRecord(payload))
+        self.assertEqual(CompactWhoisRecord(payload), parsed)
+        self.assertNotEqual(CompactWhoisRecord(), parsed)
+
+        self.assertEqual(str(Audit(payload['audit'])), str(parsed.audit))
+        self.assertEqual(str(Contact(payload['registrantContact'])), str(parsed.registrant_contact))
+        payload.pop('audit')
+        payload.pop('registrantContact')
+        self.assertEqual(str(WhoisRecord(payload)), str(CompactWhoisRecord(payload)))
+
+    def test_fingerprint(self):
+        payload = {
+            'domainName': 'domainName',
+            'createdDateISO8601': '2020-04-25T17:25:00-07:00',
+            'audit': {"createdDate": "2020-04-25T17:25:49+00:00"},
+            'nameServers': ['nameServers'],
+            'registrantContact': {'name': 'registrantContact'},
+        }
+
+        record = WhoisRecord(payload)
+        fingerprint = record.fingerprint()
+
+        self.assertEqual(64, len(fingerprint))
+        self.assertIs(fingerprint, record.fingerprint())
+        self.assertNotIn('_fingerprint', record.__dict__)
+
+        for other in (CompactWhoisRecord(payload), LazyWhoisRecord(payload), WhoisRecord(record.to_dict())):
+            self.assertEqual(fingerprint, other.fingerprint())
+            self.assertEqual(hash(record), hash(other))
+
+        # the same instant in another time zone
+        shifted = WhoisRecord(dict(payload, createdDateISO8601='2020-04-26T00:25:00+00:00'))
+        self.assertEqual(record, shifted)
+        self.assertEqual(fingerprint, shifted.fingerprint())
+
+        other = WhoisRecord(dict(payload, domainName='other'))
+        other.fingerprint()
+        self.assertNotEqual(record, other)
+        self.assertNotEqual(fingerprint, other.fingerprint())
+
+        records = [WhoisRecord(payload), CompactWhoisRecord(payload), other, LazyWhoisRecord(payload)]
+        self.assertEqual(2, len(set(records)))
+
+        self.assertEqual(hash(Contact(payload['registrantContact'])),
+                         hash(CompactContact(payload['registrantContact'])))
+        self.assertEqual(hash(Audit(payload['audit'])), hash(CompactAudit(payload['audit'])))
+        self.assertNotEqual(Contact().fingerprint(), Contact(payload['registrantContact']).fingerprint())
+
+    def test_pickle(self):
+        payload = {
+            'domainName': 'domain.test',
+            'createdDateISO8601': '2020-04-25T17:25:00-07:00',
+            'audit': {"createdDate": "2020-04-25T17:25:49+00:00"},
+            'nameServers': ['nameServers'],
+            'registrantContact': {'name': 'registrantContact'},
+        }
+
+        for factory in (WhoisRecord, CompactWhoisRecord, LazyWhoisRecord):
+            record = factory(payload)
+            record.fingerprint()
+
+            copy = pickle.loads(pickle.dumps(record))
+
+            self.assertIsInstance(copy, factory)
+            self.assertEqual(record, copy)
+            self.assertEqual(record.fingerprint(), copy.fingerprint())
+            self.assertEqual(record.to_dict(), copy.to_dict())
+
+        error = pickle.loads(pickle.dumps(ErrorMessage({'code': 403, 'messages': 'denied'})))
+        self.assertEqual('[403] denied', str(error))
+
+    def test_fingerprint_stable(self):
+        # the digest does not depend on the process, e.g. on PYTHONHASHSEED
+        record = WhoisRecord({
+            'domainName': 'example.com',
+            'createdDateISO8601': '2020-04-25T17:25:00+00:00',
+            'nameServers': ['ns1.example.com'],
+        })
+
+        self.assertEqual('c064a22c5d9f88259a352a1c998ff2f5c912c0b1a0d949cf9bfe278943c13bd1', record.fingerprint())
+
+    def test_parsing_datetime(self):
+        values = [
+            '2020-04-25T17:25:49+00:00',
+            '2020-04-25T17:25:49+0000',
+            '2020-04-25T17:25:49-07:00',
+            '2020-04-25T17:25:49+05:45',
+            '1999-12-31T23:59:59-12:00',
+            '2020-02-29T00:00:00+00:00',
+            '2021-02-29T00:00:00+00:00',
+            '2020-13-01T00:00:00+00:00',
+            '2020-04-25T24:00:00+00:00',
+            '2020-04-25T17:60:00+00:00',
+            '2020-04-25T17:25:60+00:00',
+            '2020-04-25T17:25:49+00:60',
+            '2020-04-25T17:25:49+24:00',
+            '2020-04-25T17:25:49+00:00\n',
+            '2020-04-25t17:25:49+00:00',
+            '2020-04-25T17:25:49Z',
+            '2020-04-25 17:25:49+00:00',
+            '0000-04-25T17:25:49+00:00',
+            '2020-04-25T17:25:49',
+            '',
+        ]
+
+        for v in values:
+            try:
+                valid = _strptime_datetime(v)
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    _parse_datetime(v)
+                continue
+
+            parsed = _parse_datetime(v)
+            self.assertEqual(valid, parsed)
+            self.assertEqual(valid.utcoffset(), parsed.utcoffset())
+            self.assertEqual(valid.tzinfo, parsed.tzinfo)
+
+        self.assertIs(_parse_datetime(values[0]), _parse_datetime(values[0]))
+
     def tearDown(self):
         pass
 
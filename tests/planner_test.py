@@ -0,0 +1,86 @@
+import datetime
+
+from whoishistory import ApiClient
+from whoishistory.batch import BatchResult
+from whoishistory.models.historic import *
+from whoishistory.planner import make_plan
+from whoishistory.testing import StubServer
+import unittest
+
+
+def history(count: int, domain_name: str) -> list:
+    return [{'domainName': domain_name, 'createdDateISO8601': '20%02d-01-01T00:00:00+00:00' % (10 + i)}
+            for i in range(count)]
+
+
+class PlannerTest(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_make_plan(self):
+        previews = [
+            BatchResult('a.test', result=2),
+            BatchResult('b.test', result=0),
+            BatchResult('c.test', result=5),
+            BatchResult('d.test', error=ErrorMessage({'code': 403})),
+            BatchResult('e.test', result=2),
+            BatchResult('f.test', result=9),
+        ]
+
+        plan = make_plan(previews, credits_per_purchase=10, bytes_per_record=100)
+
+        self.assertEqual(['f.test', 'c.test', 'a.test', 'e.test'], plan.domain_names)
+        self.assertEqual(['b.test'], [p.domain_name for p in plan.empty])
+        self.assertEqual(['d.test'], [p.domain_name for p in plan.failed])
+        self.assertIsInstance(plan.failed[0].error, ErrorMessage)
+        self.assertEqual(18, plan.records)
+        self.assertEqual(40, plan.credits)
+        self.assertEqual(1800, plan.estimated_bytes)
+        self.assertEqual(900, plan.largest_response)
+
+        # the budget keeps the first domains of the input
+        plan = make_plan(previews, budget=25, credits_per_purchase=10)
+
+        self.assertEqual(['c.test', 'a.test'], plan.domain_names)
+        self.assertEqual(['e.test', 'f.test'], [p.domain_name for p in plan.over_budget])
+        self.assertEqual(20, plan.credits)
+
+        plan = make_plan([], budget=0)
+        self.assertEqual(0, plan.credits)
+        self.assertEqual(0, plan.largest_response)
+
+    def test_plan_and_purchase(self):
+        histories = {
+            'small.test': history(1, 'small.test'),
+            'empty.test': [],
+            'large.test': history(6, 'large.test'),
+            'medium.test': history(3, 'medium.test'),
+        }
+
+        with StubServer(histories) as server:
+            client = ApiClient('test', url=server.url)
+
+            plan = client.plan(list(histories), max_workers=2, createdDateFrom=datetime.date(2011, 1, 1))
+
+            self.assertEqual(['large.test', 'medium.test'], plan.domain_names)
+            self.assertEqual(['small.test', 'empty.test'], [p.domain_name for p in plan.empty])
+            self.assertEqual(7, plan.records)
+            self.assertEqual(4, server.requests)
+
+            res = list(client.purchase_plan(plan, max_workers=1))
+
+            self.assertEqual(['large.test', 'medium.test'], [r.domain_name for r in res])
+            self.assertEqual([5, 2], [len(r.result) for r in res])
+            self.assertEqual(6, server.requests)
+
+            plan = client.plan(list(histories), budget=1)
+            self.assertEqual(['small.test'], plan.domain_names)
+            self.assertEqual(['large.test', 'medium.test'], [p.domain_name for p in plan.over_budget])
+
+    def tearDown(self):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
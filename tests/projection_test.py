@@ -0,0 +1,97 @@
+from whoishistory.models.historic import *
+from whoishistory.models.interning import Interner
+from whoishistory.models.projection import Projection, HEAVY_TEXT_FIELDS
+import unittest
+
+payload = {
+    'domainName': 'domain.test',
+    'updatedDateISO8601': '2020-04-25T17:25:00+00:00',
+    'audit': {"createdDate": "2020-04-25T17:25:49+00:00"},
+    'registrarName': 'registrar',
+    'cleanText': 'clean text',
+    'rawText': 'raw text',
+    'registrantContact': {'name': 'registrant', 'email': 'registrant@domain.test', 'rawText': 'raw text'},
+    'technicalContact': {'name': 'technical', 'rawText': 'raw text'},
+}
+
+
+class ProjectionTest(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_fields(self):
+        record = Projection(fields=['domain_name', 'registrant_contact.email'])(payload)
+
+        expected = WhoisRecord({
+            'domainName': 'domain.test',
+            'registrantContact': {'email': 'registrant@domain.test'},
+        })
+
+        self.assertEqual(expected, record)
+        self.assertEqual('', record.registrar_name)
+        self.assertEqual('', record.audit)
+        self.assertIsNone(record.technical_contact)
+
+        record = Projection(fields=['registrant_contact', 'registrant_contact.email'])(payload)
+        self.assertEqual(Contact(payload['registrantContact']), record.registrant_contact)
+
+    def test_exclude(self):
+        record = Projection(exclude=HEAVY_TEXT_FIELDS)(payload)
+
+        self.assertEqual('', record.raw_text)
+        self.assertEqual('', record.clean_text)
+        self.assertEqual('', record.registrant_contact.raw_text)
+        self.assertEqual('registrant', record.registrant_contact.name)
+        self.assertEqual('technical', record.technical_contact.name)
+        self.assertEqual('registrar', record.registrar_name)
+        self.assertEqual(WhoisRecord(payload).audit, record.audit)
+
+        record = Projection(exclude=['registrant_contact', 'technical_contact'])(payload)
+        self.assertIsNone(record.registrant_contact)
+        self.assertIsNone(record.technical_contact)
+        self.assertEqual('raw text', record.raw_text)
+
+        record = Projection(fields=['registrant_contact'], exclude=['registrant_contact.raw_text'])(payload)
+        self.assertEqual('registrant@domain.test', record.registrant_contact.email)
+        self.assertEqual('', record.registrant_contact.raw_text)
+
+    def test_record_factory(self):
+        for record_factory in (CompactWhoisRecord, LazyWhoisRecord, Interner()):
+            record = Projection(record_factory, exclude=HEAVY_TEXT_FIELDS)(payload)
+            self.assertEqual(Projection(exclude=HEAVY_TEXT_FIELDS)(payload), record)
+
+        lazy = Projection(LazyWhoisRecord, fields=['domain_name'])(payload)
+        self.assertEqual({'domainName': 'domain.test'}, lazy._values)
+
+        self.assertEqual(WhoisRecord(), Projection(fields=[])(payload))
+        self.assertEqual(WhoisRecord(), Projection()())
+
+    def test_built_records(self):
+        # WhoisRecord and CompactWhoisRecord are built without the projected copy
+        for record_factory in (WhoisRecord, CompactWhoisRecord):
+            for options in ({'exclude': HEAVY_TEXT_FIELDS}, {'fields': ['domain_name', 'registrant_contact.email']},
+                            {'exclude': ['registrant_contact', 'audit', 'status']}, {}):
+                projection = Projection(record_factory, **options)
+                record = projection(payload)
+
+                self.assertIsInstance(record, record_factory)
+                self.assertEqual(record_factory(projection.project(payload)), record)
+
+        records = Projection(exclude=['status'])(payload), Projection(exclude=['status'])(payload)
+        records[0].status.append('clientHold')
+        self.assertEqual([], records[1].status)
+
+    def test_unknown_field(self):
+        for name in ('unknown', 'domain_name.name', 'registrant_contact.unknown'):
+            with self.assertRaises(ValueError):
+                Projection(fields=[name])
+            with self.assertRaises(ValueError):
+                Projection(exclude=[name])
+
+    def tearDown(self):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+from whoishistory.rate_limiter import RateLimiter, RetryPolicy, _retry_after
+import asyncio
+import email.utils
+import time
+import unittest
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_rate(self):
+        limiter = RateLimiter(rate=100, burst=5)
+
+        start = time.monotonic()
+        for _ in range(15):
+            limiter.acquire()
+        elapsed = time.monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertLess(elapsed, 0.5)
+
+    def test_async_acquire(self):
+        limiter = RateLimiter(rate=100, burst=1)
+
+        async def acquire_all():
+            await asyncio.gather(*[limiter.acquire_async() for _ in range(6)])
+
+        loop = asyncio.new_event_loop()
+        start = time.monotonic()
+        try:
+            loop.run_until_complete(acquire_all())
+        finally:
+            loop.close()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_adaptive_rate(self):
+        limiter = RateLimiter(rate=10, min_rate=1, recovery=1)
+
+        limiter.throttle()
+        self.assertEqual(5, limiter.rate)
+        for _ in range(5):
+            limiter.throttle()
+        self.assertEqual(1, limiter.rate)
+
+        for _ in range(20):
+            limiter.success()
+        self.assertEqual(10, limiter.rate)
+
+    def test_retry_after_pause(self):
+        limiter = RateLimiter(rate=1000, burst=10)
+        limiter.throttle(retry_after=0.1)
+
+        start = time.monotonic()
+        limiter.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_parse_retry_after(self):
+        self.assertIsNone(_retry_after({}))
+        self.assertEqual(3.0, _retry_after({'Retry-After': '3'}))
+        self.assertIsNone(_retry_after({'Retry-After': 'soon'}))
+
+        when = email.utils.formatdate(time.time() + 60, usegmt=True)
+        self.assertAlmostEqual(60, _retry_after({'Retry-After': when}), delta=2)
+
+    def test_retry_policy(self):
+        policy = RetryPolicy(backoff=1, max_backoff=5)
+
+        for attempt in range(10):
+            delay = policy.delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(5, 2 ** attempt))
+
+        self.assertGreaterEqual(policy.delay(0, retry_after=10), 10)
+
+    def tearDown(self):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
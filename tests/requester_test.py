@@ -1,8 +1,16 @@
 from mock import patch, Mock
 from whoishistory import Requester
+from whoishistory.requester import ACCEPT_ENCODING
+from whoishistory.exceptions import ServerErrorException
+from whoishistory.rate_limiter import RateLimiter, RetryPolicy
+from whoishistory.async_requester import AsyncRequester
+from whoishistory.testing import StubServer
 
+import asyncio
 import unittest
 import requests
+import urllib3
+import gzip
 import io
 
 _user_agent = "test-user-agent"
@@ -24,31 +32,81 @@ def mocked_requests(*args, **kwargs):
     return MockResponse('999', 999)
 
 
+def mocked_sequence(*responses):
+    responses = list(responses)
+
+    def request(*args, **kwargs):
+        status_code, headers = responses.pop(0)
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers.update(headers)
+        response.raw = io.BytesIO(bytes(str(status_code), encoding="utf8"))
+        return response
+
+    return request
+
+
+def mocked_gzip(body: bytes):
+    def request(*args, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = urllib3.HTTPResponse(io.BytesIO(gzip.compress(body)), headers={'Content-Encoding': 'gzip'},
+                                            preload_content=False)
+        return response
+
+    return request
+
+
+class RecordingRateLimiter(RateLimiter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.throttled = []
+
+    def throttle(self, retry_after: float = None):
+        self.throttled.append(retry_after)
+        super().throttle(retry_after)
+
+
+def run_async(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def request_stub(requester: AsyncRequester, url: str, count: int) -> list:
+    async with requester:
+        return [await requester.request(url, params={'domainName': 'a.test'}) for _ in range(count)]
+
+
 class RequesterTest(unittest.TestCase):
     def setUp(self):
         pass
 
-    @patch('whoishistory.requester.requests.request', side_effect=mocked_requests)
+    @patch('whoishistory.requester.requests.Session.request', side_effect=mocked_requests)
     def test_url(self, mock_urlopen):
         requester = Requester(_user_agent)
         res = requester.request('http://test.test/200')
         self.assertEqual(
             res.text,
             "('GET', 'http://test.test/200')"
-            "{'headers': {'Accept': 'application/json', 'User-Agent': 'test-user-agent'}, 'params': {}}",
+            "{'headers': {'Accept': 'application/json', 'Accept-Encoding': '" + ACCEPT_ENCODING + "', "
+            "'User-Agent': 'test-user-agent'}, 'params': {}, 'stream': False}",
         )
 
-    @patch('whoishistory.requester.requests.request', side_effect=mocked_requests)
+    @patch('whoishistory.requester.requests.Session.request', side_effect=mocked_requests)
     def test_method(self, mock_urlopen):
         requester = Requester(_user_agent)
         res = requester.request('http://test.test/200', method="POST")
         self.assertEqual(
             res.text,
             "('POST', 'http://test.test/200')"
-            "{'headers': {'Accept': 'application/json', 'User-Agent': 'test-user-agent'}, 'params': {}}",
+            "{'headers': {'Accept': 'application/json', 'Accept-Encoding': '" + ACCEPT_ENCODING + "', "
+            "'User-Agent': 'test-user-agent'}, 'params': {}, 'stream': False}",
         )
 
-    @patch('whoishistory.requester.requests.request', side_effect=mocked_requests)
+    @patch('whoishistory.requester.requests.Session.request', side_effect=mocked_requests)
     def test_headers(self, mock_urlopen):
         requester = Requester(_user_agent)
         res = requester.request('http://test.test/200', method="POST",
@@ -56,11 +114,12 @@ class RequesterTest(unittest.TestCase):
         self.assertEqual(
             res.text,
             "('POST', 'http://test.test/200')"
-            "{'headers': {'My-Header': 'value', 'Accept': 'application/json', 'User-Agent': 'test-user-agent'}, "
-            "'params': {}}",
+            "{'headers': {'My-Header': 'value', 'Accept': 'application/json', "
+            "'Accept-Encoding': '" + ACCEPT_ENCODING + "', "
+            "'User-Agent': 'test-user-agent'}, 'params': {}, 'stream': False}",
         )
 
-    @patch('whoishistory.requester.requests.request', side_effect=mocked_requests)
+    @patch('whoishistory.requester.requests.Session.request', side_effect=mocked_requests)
     def test_query_params(self, mock_urlopen):
         requester = Requester(_user_agent)
         res = requester.request('http://test.test/200', method="POST",
@@ -68,9 +127,134 @@ class RequesterTest(unittest.TestCase):
         self.assertEqual(
             res.text,
             "('POST', 'http://test.test/200')"
-            "{'headers': {'Accept': 'application/json', 'User-Agent': 'test-user-agent'}, "
-            "'params': {'MyParam': 'value'}}",
+            "{'headers': {'Accept': 'application/json', 'Accept-Encoding': '" + ACCEPT_ENCODING + "', "
+            "'User-Agent': 'test-user-agent'}, 'params': {'MyParam': 'value'}, 'stream': False}",
         )
 
+    @patch('whoishistory.requester.requests.Session.request', side_effect=mocked_requests)
+    def test_session_reused(self, mock_urlopen):
+        requester = Requester(_user_agent)
+        session = requester.session
+        requester.request('http://test.test/200')
+        requester.request('http://test.test/200')
+        self.assertIs(session, requester.session)
+        self.assertEqual(mock_urlopen.call_count, 2)
+
+    def test_pool_options(self):
+        requester = Requester(_user_agent, pool_connections=3, pool_maxsize=7, max_retries=2)
+        adapter = requester.session.get_adapter('https://test.test/')
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertEqual(adapter.max_retries.total, 2)
+
+    def test_close(self):
+        with Requester(_user_agent) as requester:
+            requester.session.close = Mock()
+        requester.session.close.assert_called_once_with()
+
+    @patch('whoishistory.requester.requests.Session.request', side_effect=mocked_requests)
+    def test_server_error(self, mock_urlopen):
+        requester = Requester(_user_agent)
+
+        with self.assertRaises(ServerErrorException) as cm:
+            requester.request('http://test.test/500')
+
+        self.assertEqual(500, cm.exception.status_code)
+        self.assertEqual(1, mock_urlopen.call_count)
+
+    @patch('whoishistory.requester.time.sleep')
+    def test_retries(self, mock_sleep):
+        requester = Requester(_user_agent, retry_policy=RetryPolicy(max_retries=2))
+
+        with patch('whoishistory.requester.requests.Session.request',
+                   side_effect=mocked_sequence((503, {}), (429, {'Retry-After': '7'}), (200, {}))):
+            res = requester.request('http://test.test/')
+
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(2, mock_sleep.call_count)
+        self.assertGreaterEqual(mock_sleep.call_args[0][0], 7)
+
+        with patch('whoishistory.requester.requests.Session.request',
+                   side_effect=mocked_sequence((503, {}), (502, {}), (500, {}))):
+            with self.assertRaises(ServerErrorException) as cm:
+                requester.request('http://test.test/')
+
+        self.assertEqual(500, cm.exception.status_code)
+        self.assertEqual('[500] 500', str(cm.exception))
+
+    @patch('whoishistory.requester.time.sleep')
+    def test_rate_limiter_throttled(self, mock_sleep):
+        limiter = RateLimiter(rate=1000, burst=10)
+        requester = Requester(_user_agent, rate_limiter=limiter, retry_policy=RetryPolicy(max_retries=1))
+
+        with patch('whoishistory.requester.requests.Session.request',
+                   side_effect=mocked_sequence((429, {}), (200, {}))):
+            requester.request('http://test.test/')
+
+        self.assertLess(limiter.rate, 1000)
+
+    def test_compressed_transfer(self):
+        body = b'{"records":[' + b','.join([b'{"rawText":"Domain Name: domain.test"}'] * 100) + b']}'
+        requester = Requester(_user_agent)
+
+        with patch('whoishistory.requester.requests.Session.request', side_effect=mocked_gzip(body)):
+            res = requester.request('http://test.test/')
+
+        self.assertEqual(body, res.content)
+        self.assertEqual(1, requester.transfer_stats.responses)
+        self.assertEqual(len(body), requester.transfer_stats.decoded_bytes)
+        self.assertEqual(len(gzip.compress(body)), requester.transfer_stats.wire_bytes)
+        self.assertGreater(requester.transfer_stats.compression_ratio, 10)
+
+        with patch('whoishistory.requester.requests.Session.request', side_effect=mocked_gzip(body)):
+            res = requester.request('http://test.test/', stream=True)
+            chunks = list(res.iter_content(16))
+            requester.count_transfer(res, sum(map(len, chunks)))
+
+        self.assertEqual(body, b''.join(chunks))
+        self.assertEqual(2, requester.transfer_stats.responses)
+        self.assertEqual(2 * len(body), requester.transfer_stats.decoded_bytes)
+
+    @patch('whoishistory.requester.requests.Session.request', side_effect=mocked_requests)
+    def test_compress_disabled(self, mock_urlopen):
+        requester = Requester(_user_agent, compress=False)
+        requester.request('http://test.test/200')
+
+        self.assertEqual('identity', mock_urlopen.call_args[1]['headers']['Accept-Encoding'])
+        self.assertIn('gzip', ACCEPT_ENCODING)
+
+    def test_async_rate_limited_retry(self):
+        limiter = RecordingRateLimiter(1000, burst=10)
+        requester = AsyncRequester(_user_agent, rate_limiter=limiter,
+                                   retry_policy=RetryPolicy(max_retries=20, backoff=0.05))
+
+        with StubServer(records=1, rate_limit=1, retry_after=0) as server:
+            responses = run_async(request_stub(requester, server.url, 2))
+
+            self.assertEqual([200, 200], [r.status for r in responses])
+            self.assertEqual(b'{"recordsCount": 1}', responses[1].body)
+            self.assertEqual(2, server.statuses[200])
+            self.assertGreater(server.statuses[429], 0)
+
+        # Retry-After of the 429 responses
+        self.assertEqual([0.0] * server.statuses[429], limiter.throttled)
+
+    def test_async_retries_exhausted(self):
+        requester = AsyncRequester(_user_agent, retry_policy=RetryPolicy(max_retries=2, backoff=0.01))
+
+        with StubServer(records=1, error_rate=1.0, error_status=503) as server:
+            with self.assertRaises(ServerErrorException) as cm:
+                run_async(request_stub(requester, server.url, 1))
+
+            self.assertEqual(503, cm.exception.status_code)
+            self.assertEqual(3, server.requests)
+
+        with StubServer(records=1, error_rate=1.0, error_status=500) as server:
+            with self.assertRaises(ServerErrorException) as cm:
+                run_async(request_stub(AsyncRequester(_user_agent), server.url, 1))
+
+            self.assertEqual(500, cm.exception.status_code)
+            self.assertEqual(1, server.requests)
+
     def tearDown(self):
         pass
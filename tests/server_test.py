@@ -0,0 +1,82 @@
+import datetime
+
+from whoishistory import ApiClient
+from whoishistory.exceptions import ServerErrorException
+from whoishistory.models.historic import *
+from whoishistory.rate_limiter import RetryPolicy
+from whoishistory.testing import StubServer, synthetic_records
+import unittest
+import requests
+
+
+class StubServerTest(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_purchase(self):
+        history = [
+            {'domainName': 'a.test', 'createdDateISO8601': '2010-05-01T00:00:00+00:00',
+             'audit': {'updatedDate': '2019-01-01T00:00:00+00:00'}},
+            {'domainName': 'a.test', 'createdDateISO8601': '2015-05-01T00:00:00+00:00',
+             'audit': {'updatedDate': '2021-01-01T00:00:00+00:00'}},
+        ]
+
+        with StubServer({'a.test': history}, records=20) as server:
+            client = ApiClient('test', url=server.url)
+
+            self.assertEqual([WhoisRecord(r) for r in history], client.purchase('a.test'))
+            self.assertEqual(1, client.preview('a.test', sinceDate=datetime.date(2020, 1, 1)))
+            self.assertEqual(1, client.preview('a.test', createdDateTo=datetime.date(2012, 1, 1)))
+            self.assertEqual(0, client.preview('a.test', createdDateFrom=datetime.date(2016, 1, 1)))
+
+            self.assertEqual(20, client.preview('b.test'))
+            records = client.purchase('b.test')
+            self.assertEqual(records, list(client.iter_purchase('b.test', chunk_size=1024)))
+            self.assertEqual({'b.test'}, set(r.domain_name for r in records))
+
+            stats = client.requester.transfer_stats
+            self.assertLess(stats.wire_bytes, stats.decoded_bytes)
+
+    def test_errors(self):
+        with StubServer(api_keys=['key'], records=1) as server:
+            with self.assertRaises(ErrorMessage) as cm:
+                ApiClient('wrong', url=server.url).preview('a.test')
+            self.assertEqual(403, cm.exception.code)
+
+            response = requests.get(server.url, params={'apiKey': 'key', 'domainName': 'a.test', 'mode': 'other'})
+            self.assertEqual(422, response.status_code)
+            self.assertEqual(422, response.json()['code'])
+            self.assertIn('messages', response.json())
+
+    def test_injected_failures(self):
+        with StubServer(records=1, error_rate=1.0, error_status=500) as server:
+            with self.assertRaises(ServerErrorException) as cm:
+                ApiClient('test', url=server.url).preview('a.test')
+            self.assertEqual(500, cm.exception.status_code)
+
+        with StubServer(records=1, rate_limit=1, retry_after=0) as server:
+            client = ApiClient('test', url=server.url, retry_policy=RetryPolicy(max_retries=20, backoff=0.1))
+
+            for _ in range(3):
+                self.assertEqual(1, client.preview('a.test'))
+
+            self.assertEqual(3, server.statuses[200])
+            self.assertGreater(server.statuses[429], 0)
+
+        with StubServer(records=1, rate_limit=0.5) as server:
+            params = {'apiKey': 'test', 'domainName': 'a.test', 'mode': 'preview'}
+
+            self.assertEqual(200, requests.get(server.url, params=params).status_code)
+            self.assertEqual(429, requests.get(server.url, params=params).status_code)
+
+    def test_synthetic_records(self):
+        self.assertEqual(synthetic_records(3, seed=7), synthetic_records(3, seed=7))
+        self.assertNotEqual(synthetic_records(3, seed=7), synthetic_records(3, seed=8))
+
+    def tearDown(self):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import datetime
+
+from whoishistory import ApiClient
+from whoishistory.exceptions import ServerErrorException
+from whoishistory.models.historic import *
+from whoishistory.sharding import split_windows, merge_shards, date_range
+from whoishistory.testing import StubServer
+import threading
+import unittest
+
+
+def history(count: int, domain_name: str = 'a.test') -> list:
+    records = []
+    for i in range(count):
+        day = datetime.date(2000, 1, 1) + datetime.timedelta(days=i * 37)
+        records.append({
+            'domainName': domain_name,
+            'updatedDateISO8601': day.isoformat() + 'T12:00:00+00:00',
+            'rawText': 'record %d' % i,
+        })
+    return records
+
+
+class FlakyApiClient(ApiClient):
+    def __init__(self, api_key, failures: int, **options):
+        super().__init__(api_key, **options)
+        self.failures = failures
+        self.lock = threading.Lock()
+
+    def purchase_raw(self, domain_name: str, **options):
+        with self.lock:
+            if self.failures > 0:
+                self.failures -= 1
+                raise ServerErrorException(503, 'unavailable')
+
+        return super().purchase_raw(domain_name, **options)
+
+
+class ShardingTest(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_split_windows(self):
+        days = [datetime.date(2020, 1, 1) + datetime.timedelta(days=i) for i in range(100)] * 2
+        days.append(datetime.date(2020, 1, 1))
+
+        def count(first, last):
+            return sum(1 for d in days if first <= d <= last)
+
+        windows = split_windows(count, datetime.date(2019, 1, 1), datetime.date(2021, 12, 31), 10, max_workers=2)
+
+        self.assertEqual(len(days), sum(n for _, _, n in windows))
+        for first, last, n in windows:
+            self.assertLessEqual(first, last)
+            self.assertTrue(n <= 10 or first == last)
+        for a, b in zip(windows, windows[1:]):
+            self.assertLess(a[1], b[0])
+
+        # a single day is not split further
+        self.assertEqual([(datetime.date(2020, 1, 1),) * 2 + (201,)],
+                         split_windows(lambda first, last: 201, datetime.date(2020, 1, 1),
+                                       datetime.date(2020, 1, 1), 10))
+
+    def test_merge_shards(self):
+        a, b, c = {'rawText': 'a'}, {'rawText': 'b'}, {'rawText': 'c'}
+
+        self.assertEqual([a, b, a, c], merge_shards([[a, b, a], [a, c]]))
+        self.assertEqual([a, b, a], merge_shards([[a, b], [a, a]]))
+        self.assertEqual([], merge_shards([]))
+
+    def test_date_range(self):
+        lo, hi = date_range('created', {'createdDateFrom': datetime.date(2010, 1, 1)})
+        self.assertEqual(datetime.date(2010, 1, 1), lo)
+        self.assertGreater(hi, datetime.date.today())
+
+        with self.assertRaises(ValueError):
+            date_range('other', {})
+
+    def test_purchase_sharded(self):
+        records = history(50)
+
+        with StubServer({'a.test': records, 'b.test': records[:5]}) as server:
+            client = ApiClient('test', url=server.url)
+
+            res = client.purchase_sharded('a.test', max_records=8, max_workers=3)
+            # windows are merged in date order
+            self.assertEqual([WhoisRecord(r) for r in records], res)
+            self.assertEqual(50, len(res))
+
+            purchases = server.statuses[200]
+            self.assertEqual(res, client.purchase_sharded('a.test', max_records=1000))
+            # one preview and one purchase
+            self.assertEqual(purchases + 2, server.statuses[200])
+
+            res = client.purchase_sharded('a.test', max_records=8, updatedDateFrom=datetime.date(2002, 1, 1),
+                                          fields=['raw_text'])
+            self.assertEqual(sorted(r['rawText'] for r in records if r['updatedDateISO8601'] >= '2002'),
+                             sorted(r.raw_text for r in res))
+            self.assertEqual('', res[0].domain_name)
+
+            self.assertEqual(5, len(client.purchase_sharded('b.test', max_records=2, dedup=True)))
+
+    def test_uncovered_records(self):
+        # records without the shard date are not in any window
+        records = history(20) + [{'domainName': 'a.test', 'rawText': 'undated'}]
+
+        with StubServer({'a.test': records}) as server:
+            client = ApiClient('test', url=server.url)
+
+            res = client.purchase_sharded('a.test', max_records=5)
+
+            self.assertEqual(21, len(res))
+            self.assertIn('undated', [r.raw_text for r in res])
+
+    def test_shard_retries(self):
+        with StubServer({'a.test': history(30)}) as server:
+            client = FlakyApiClient('test', failures=2, url=server.url)
+
+            self.assertEqual(30, len(client.purchase_sharded('a.test', max_records=10, shard_retries=2)))
+
+            client = FlakyApiClient('test', failures=100, url=server.url)
+            with self.assertRaises(ServerErrorException):
+                client.purchase_sharded('a.test', max_records=10, shard_retries=1)
+
+    def tearDown(self):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
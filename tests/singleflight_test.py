@@ -0,0 +1,66 @@
+from whoishistory.singleflight import SingleFlight
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import unittest
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_coalesce(self):
+        flights = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            release.wait()
+            return 'result'
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(flights.do, 'key', fn) for _ in range(5)]
+            time.sleep(0.1)
+            release.set()
+            results = [f.result() for f in futures]
+
+        self.assertEqual(['result'] * 5, results)
+        self.assertEqual(1, len(calls))
+        self.assertEqual(0, len(flights))
+
+    def test_shared_error(self):
+        flights = SingleFlight()
+        release = threading.Event()
+        started = threading.Event()
+
+        def fn():
+            started.set()
+            release.wait()
+            raise ValueError('failed')
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(flights.do, 'key', fn)
+            started.wait()
+            follower = executor.submit(flights.do, 'key', lambda: 'unused')
+            time.sleep(0.1)
+            release.set()
+
+            with self.assertRaises(ValueError):
+                leader.result()
+            with self.assertRaises(ValueError):
+                follower.result()
+
+    def test_sequential_calls(self):
+        flights = SingleFlight()
+
+        self.assertEqual(1, flights.do('key', lambda: 1))
+        self.assertEqual(2, flights.do('key', lambda: 2))
+
+    def tearDown(self):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+from whoishistory import ApiClient
+from whoishistory.models.historic import *
+from whoishistory.models.interning import Interner
+from whoishistory.models.projection import Projection
+from whoishistory.store import HistoryStore
+import os
+import tempfile
+import unittest
+
+
+def record(i, registrar='registrar'):
+    return {
+        'domainName': 'domain.test',
+        'updatedDateISO8601': '2020-04-%02dT10:00:00-07:00' % i,
+        'audit': {'createdDate': '2020-04-%02dT00:00:00+00:00' % i, 'updatedDate': '2020-04-%02dT12:00:00+00:00' % i},
+        'nameServers': ['ns1.domain.test'],
+        'registrarName': registrar,
+        'registrantContact': {'name': 'registrant %d' % i},
+    }
+
+
+class MockClient(ApiClient):
+    def __init__(self, responses: list):
+        super().__init__('test')
+        self.responses = responses
+        self.calls = []
+
+    def purchase(self, domain_name: str, record_factory=WhoisRecord, dedup: bool = False, **options):
+        self.calls.append(options)
+        return [record_factory(r) for r in self.responses.pop(0)]
+
+
+class HistoryStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'history.sqlite')
+
+    def test_round_trip(self):
+        with HistoryStore(self.path) as store:
+            records = [WhoisRecord(record(2)), WhoisRecord(record(1)), WhoisRecord({'domainName': 'domain.test'})]
+            self.assertEqual(3, store.add('Domain.Test', records))
+            self.assertEqual(0, store.add('domain.test', records))
+
+            stored = store.records('domain.test')
+            self.assertEqual([records[2], records[1], records[0]], stored)
+            self.assertEqual(3, store.count())
+            self.assertEqual(['domain.test'], store.domains())
+
+    def test_queries(self):
+        with HistoryStore(self.path) as store:
+            store.add('domain.test', [WhoisRecord(record(i)) for i in range(1, 4)])
+            store.add('other.test', [WhoisRecord(record(5, registrar='other'))])
+
+            self.assertEqual(datetime.datetime(2020, 4, 3, 12, tzinfo=datetime.timezone.utc),
+                             store.latest_audit_date('domain.test'))
+            self.assertIsNone(store.latest_audit_date('missing.test'))
+
+            since = datetime.datetime(2020, 4, 2, 12, tzinfo=datetime.timezone.utc)
+            self.assertEqual([WhoisRecord(record(2)), WhoisRecord(record(3))], store.records('domain.test', since))
+            self.assertEqual([WhoisRecord(record(5, registrar='other'))], store.by_registrar('other'))
+            self.assertEqual(1, store.count('other.test'))
+
+    def test_sync(self):
+        client = MockClient([
+            [record(1), record(2)],
+            [record(2), record(3)],
+        ])
+
+        with HistoryStore(self.path, client) as store:
+            self.assertEqual(2, store.sync('domain.test'))
+            self.assertEqual(1, store.sync('domain.test'))
+
+            self.assertEqual({}, client.calls[0])
+            self.assertEqual({'sinceDate': datetime.date(2020, 4, 2)}, client.calls[1])
+            self.assertEqual(3, store.count('domain.test'))
+
+        with HistoryStore(self.path) as store:
+            self.assertEqual(3, store.count())
+
+    def test_sync_since_date(self):
+        client = MockClient([
+            [record(1), record(2)],
+            [record(3)],
+            [record(3)],
+        ])
+
+        with HistoryStore(self.path, client) as store:
+            self.assertEqual(2, store.sync('domain.test', sinceDate=datetime.date(2020, 3, 1)))
+            self.assertEqual(1, store.sync('domain.test', sinceDate=datetime.date(2020, 4, 3)))
+            self.assertEqual(0, store.sync('domain.test', sinceDate=datetime.date(2020, 1, 1)))
+
+            self.assertEqual({'sinceDate': datetime.date(2020, 3, 1)}, client.calls[0])
+            self.assertEqual({'sinceDate': datetime.date(2020, 4, 3)}, client.calls[1])
+            self.assertEqual({'sinceDate': datetime.date(2020, 4, 3)}, client.calls[2])
+
+        client = MockClient([[record(1), record(2)], [record(3)]])
+
+        with HistoryStore(self.path + '-datetime', client) as store:
+            self.assertEqual(2, store.sync('domain.test', sinceDate=datetime.datetime(2020, 3, 1, 12, 30)))
+            self.assertEqual(1, store.sync('domain.test', sinceDate=datetime.datetime(2020, 1, 1, 12, 30)))
+
+            self.assertEqual({'sinceDate': datetime.date(2020, 3, 1)}, client.calls[0])
+            self.assertEqual({'sinceDate': datetime.date(2020, 4, 2)}, client.calls[1])
+
+    def test_sync_projection(self):
+        with HistoryStore(self.path, MockClient([])) as store:
+            for options in ({'fields': ['domain_name']}, {'exclude': ['raw_text']},
+                            {'record_factory': Interner(Projection(fields=['domain_name']))}):
+                with self.assertRaises(ValueError):
+                    store.sync('domain.test', **options)
+
+            self.assertEqual(0, store.count())
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+from whoishistory.streaming import RecordsStream, iter_records
+from whoishistory.models.historic import ErrorMessage
+from whoishistory.exceptions import EmptyResponseException, UnparsableResponseException
+import json
+import unittest
+
+
+def chunked(body: bytes, size: int):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class StreamingTest(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_records(self):
+        records = [
+            {"domainName": "a.test", "nameServers": ["ns1", "ns2"], "rawText": "quote \" brace } [ \\\\ end"},
+            {"domainName": "b.test", "audit": {"createdDate": "2020-04-25T17:25:49+00:00"}, "n": 1.5e3},
+            {"domainName": "ünicode.test", "status": [], "zoneContact": None, "flag": True},
+        ]
+        body = json.dumps({"recordsCount": 3, "records": records, "extra": {"a": [1, {"b": "]"}]}},
+                          ensure_ascii=False, indent=1).encode('utf-8')
+
+        for size in (1, 2, 3, 5, 64, len(body)):
+            self.assertEqual(records, list(iter_records(chunked(body, size))))
+            # values are scanned for with other loads functions
+            self.assertEqual(records, list(iter_records(chunked(body, size), lambda s: json.loads(s))))
+
+    def test_head(self):
+        stream = RecordsStream()
+        self.assertEqual([{"a": 1}], stream.feed(b'{"recordsCount":1,"records":[{"a":1}],"x":null}'))
+        stream.close()
+        self.assertEqual({"recordsCount": 1, "records": [], "x": None}, stream.head)
+
+    def test_empty_records(self):
+        self.assertEqual([], list(iter_records([b'{"records":[]}'])))
+        self.assertEqual([], list(iter_records([b'{"records":null}'])))
+
+    def test_error_message(self):
+        with self.assertRaises(ErrorMessage):
+            list(iter_records([b'{"code":999, "messages":"test error message"}']))
+
+    def test_empty_response(self):
+        with self.assertRaises(EmptyResponseException):
+            list(iter_records([]))
+
+        with self.assertRaises(EmptyResponseException):
+            list(iter_records([b'{"recordsCount":1}']))
+
+    def test_unparsable_response(self):
+        for body in (b'not a json', b'{"records":[{"a":1}', b'{"records":[{"a":}]}', b'{}{', b'{"a" 1}'):
+            with self.assertRaises(UnparsableResponseException):
+                list(iter_records(chunked(body, 3)))
+            with self.assertRaises(UnparsableResponseException):
+                list(iter_records([body]))
+
+    def tearDown(self):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()